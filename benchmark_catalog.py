@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Measure what it costs the player to find its media in a large directory.
+
+Fills a temporary media directory with placeholder images and videos
+spread over subfolders, then times a cycle's setup the way the player did
+before (categorize_media_files, a full directory walk every cycle) and
+with the inotify-driven MediaCatalog: the initial scan, an unchanged
+cycle, a cycle after the sync added one file, and one step of follow(),
+the lookup made before each item.
+The polling fallback is timed too. Run it on the Pi with the file count
+you expect to show.
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+PROJECT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(PROJECT_DIR))
+
+import media_player  # noqa: E402
+
+
+def make_media(media_dir: Path, count: int, per_folder: int) -> None:
+    for index in range(count):
+        folder = media_dir / f"folder-{index // per_folder:03d}"
+        folder.mkdir(exist_ok=True)
+        suffix = ".mp4" if index % 5 == 0 else ".jpg"
+        (folder / f"item-{index:05d}{suffix}").write_bytes(b"")
+
+
+def median_ms(action: Callable[[], object], runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        action()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure player cycle setup for a large media directory.")
+    parser.add_argument("--files", type=int, default=10_000, help="Media files to create.")
+    parser.add_argument("--per-folder", type=int, default=100, help="Files per subfolder.")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per measurement.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        media_dir = Path(tmp)
+        make_media(media_dir, args.files, args.per_folder)
+        print(f"{args.files:,} files in {-(-args.files // args.per_folder)} folders:")
+
+        walk = median_ms(lambda: media_player.categorize_media_files(media_dir), args.runs)
+        print(f"  walk per cycle (categorize_media_files)  {walk:9.3f} ms")
+
+        started = time.perf_counter()
+        catalog = media_player.MediaCatalog(media_dir)
+        scan = (time.perf_counter() - started) * 1000
+        if catalog._inotify is None:
+            print("  catalog: inotify unavailable here, only polling is measured")
+        else:
+            unchanged = median_ms(catalog.has_media, args.runs)
+            added = []
+            for run in range(args.runs):
+                (media_dir / "folder-000" / f"new-{run}.jpg").write_bytes(b"")
+                started = time.perf_counter()
+                catalog.has_media()
+                added.append((time.perf_counter() - started) * 1000)
+                assert f"folder-000/new-{run}.jpg" in catalog._files["images"]
+            videos = catalog.follow("videos")
+            next(videos)
+            step = median_ms(lambda: next(videos), args.runs)
+            print(f"  catalog: initial scan and watches        {scan:9.3f} ms")
+            print(f"  catalog: cycle, nothing changed          {unchanged:9.3f} ms")
+            print(f"  catalog: cycle after one new file        {statistics.median(added):9.3f} ms")
+            print(f"  catalog: next item (follow)              {step:9.3f} ms")
+        catalog.close()
+
+        polling = media_player.MediaCatalog(media_dir, use_inotify=False)
+        rescan = median_ms(polling._rescan, args.runs)
+        polling.close()
+        print(f"  polling: rescan every {media_player.CATALOG_POLL_SECONDS}s                {rescan:9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Measure what a sync cycle costs in daemon mode next to a one-shot run.
+
+A one-shot run (the systemd timer) starts Python, imports the Google client
+libraries, builds the Drive service and opens the sync state before it can
+look for changes; the daemon pays that once and then only runs the cycle.
+Both are timed against the in-memory Drive from tests/fake_drive.py holding
+--files already-synced files, with no changes (the common case) and with
+one new file. Startup is timed in a child process with static discovery
+and anonymous credentials, so the token exchange and network round trips
+a real run adds are not included. Run it on the Pi after changing the
+daemon or the startup path.
+"""
+
+import argparse
+import logging
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+PROJECT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(PROJECT_DIR))
+
+import gdrive_sync  # noqa: E402
+from tests.fake_drive import FakeDrive  # noqa: E402
+
+STARTUP_CODE = """
+import resource, sys
+sys.path.insert(0, sys.argv[1])
+import gdrive_sync
+from google.auth.credentials import AnonymousCredentials
+gdrive_sync.build_drive_service(AnonymousCredentials())
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def startup() -> tuple[float, int]:
+    """Return (wall seconds, peak RSS in KiB) of starting a one-shot run."""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", STARTUP_CODE, str(PROJECT_DIR)],
+        check=True, capture_output=True, text=True,
+    )
+    return time.perf_counter() - started, int(result.stdout.split()[-1])
+
+
+def median_ms(action: Callable[[], object], runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        action()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure per-cycle cost of the sync daemon against one-shot runs.")
+    parser.add_argument("--files", type=int, default=1000, help="Files in the Drive folder.")
+    parser.add_argument("--interval", type=int, default=300, help="Sync interval in seconds.")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per measurement.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    logging.disable(logging.CRITICAL)
+    gdrive_sync.drive_requests.requests_per_second = 0
+    startups = [startup() for _ in range(args.runs)]
+    start_ms = statistics.median(wall for wall, _ in startups) * 1000
+    start_rss = statistics.median(rss for _, rss in startups) / 1024
+
+    with tempfile.TemporaryDirectory() as tmp:
+        media_dir = Path(tmp)
+        drive = FakeDrive()
+        for index in range(args.files):
+            drive.add(f"clip-{index:05d}.mp4", b"x")
+        options = gdrive_sync.SyncOptions(incremental=True, mime_types=())
+        gdrive_sync.sync_drive_folder(drive, "root", media_dir, options)
+
+        def one_shot() -> None:
+            gdrive_sync.sync_drive_folder(drive, "root", media_dir, options)
+
+        state = gdrive_sync.SyncState.for_media_dir(media_dir)
+
+        def daemon() -> None:
+            gdrive_sync.sync_drive_folder(drive, "root", media_dir, options, state)
+
+        def with_new_file(cycle: Callable[[], None]) -> Callable[[], None]:
+            def run() -> None:
+                drive.add(f"new-{len(drive.items)}.mp4", b"x")
+                cycle()
+            return run
+
+        idle_one_shot = median_ms(one_shot, args.runs)
+        idle_daemon = median_ms(daemon, args.runs)
+        new_one_shot = median_ms(with_new_file(one_shot), args.runs)
+        new_daemon = median_ms(with_new_file(daemon), args.runs)
+        state.close()
+
+    daemon_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    saved = start_ms + idle_one_shot - idle_daemon
+    print(f"{args.files:,} synced files, incremental sync:")
+    print(f"  one-shot startup (python, imports, service) {start_ms:9.1f} ms  peak {start_rss:6.1f} MiB")
+    print(f"  cycle, no changes:   one-shot {idle_one_shot:9.1f} ms   daemon {idle_daemon:9.1f} ms")
+    print(f"  cycle, one new file: one-shot {new_one_shot:9.1f} ms   daemon {new_daemon:9.1f} ms")
+    print(f"  daemon saves {saved:.1f} ms per cycle, {saved * 86400 / args.interval / 1000:.1f} s a day "
+          f"at a {args.interval}s interval")
+    print(f"  daemon stays resident between cycles: peak {daemon_rss:.1f} MiB here, fake Drive included")
+
+
+if __name__ == "__main__":
+    main()
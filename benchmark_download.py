@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Measure what download verification costs next to the transfer itself.
+
+Runs download_file against an in-memory Drive stand-in, so the time is the
+sync's own work (ranged requests, writes, fsyncs and the streaming MD5),
+and times hashing the same bytes on their own. The MD5 share is then
+compared with how long the file would take over a real link.
+
+With --latency-ms, every ranged GET also waits that long before it is
+answered, like a round trip to Drive, and --files small files are fetched
+through download_files with one worker and with --workers, showing what the
+worker pool gains when transfers are latency-bound.
+
+With --memory, download_file runs in a fresh process for each file size and
+chunk size in --memory-sizes-mb and --memory-chunks-mb, serving generated
+content that is never held in memory whole, and reports how much the
+download raised the process's peak RSS. It should follow the chunk size and
+stay flat as files grow. Run it on the Pi after changing the download path,
+the chunk size or the worker pool.
+"""
+
+import argparse
+import hashlib
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+PROJECT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(PROJECT_DIR))
+
+import gdrive_sync  # noqa: E402
+
+
+class _Response(dict):
+    def __init__(self, status: int, headers: dict):
+        super().__init__(headers)
+        self.status = status
+
+
+class _MediaRequest:
+    """Serves byte ranges of content the way a get_media request does."""
+
+    uri = "memory://media"
+    headers: dict = {}
+
+    def __init__(self, content: bytes, latency: float = 0.0):
+        self.http = self
+        self._content = content
+        self._latency = latency
+
+    def request(self, uri, method, headers):
+        if self._latency:
+            time.sleep(self._latency)
+        start, _, end = headers["range"][len("bytes="):].partition("-")
+        start, end = int(start), min(int(end), len(self._content) - 1)
+        if start >= len(self._content):
+            return _Response(416, {}), b""
+        content_range = f"bytes {start}-{end}/{len(self._content)}"
+        return _Response(206, {"content-range": content_range}), self._content[start:end + 1]
+
+
+class _PatternContent:
+    """size bytes of a repeated random block, generated one slice at a time."""
+
+    def __init__(self, size: int, block_size: int = 1024 * 1024):
+        self._size = size
+        self._block = os.urandom(block_size)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: slice) -> memoryview:
+        start, stop, _ = index.indices(self._size)
+        offset = start % len(self._block)
+        repeats = -(-(offset + stop - start) // len(self._block))
+        return memoryview(self._block * repeats)[offset:offset + stop - start]
+
+    def md5(self) -> str:
+        digest = hashlib.md5()
+        for start in range(0, self._size, len(self._block)):
+            digest.update(self[start:start + len(self._block)])
+        return digest.hexdigest()
+
+
+class _MemoryDrive:
+    """Serves the same content for every file ID, each request after latency seconds."""
+
+    def __init__(self, content: bytes, latency: float = 0.0):
+        self._content = content
+        self._latency = latency
+
+    def files(self):
+        return self
+
+    def get_media(self, fileId):
+        return _MediaRequest(self._content, self._latency)
+
+
+def make_entry(content, file_id: str = "benchmark") -> gdrive_sync.DriveFile:
+    md5 = content.md5() if isinstance(content, _PatternContent) else hashlib.md5(content).hexdigest()
+    return gdrive_sync.DriveFile(
+        file_id=file_id,
+        name=f"{file_id}.bin",
+        modified_ts=time.time(),
+        mime_type="video/mp4",
+        md5_checksum=md5,
+        size=len(content),
+    )
+
+
+def time_download(content: bytes, chunk_size: int, runs: int) -> float:
+    entry = make_entry(content)
+    service = _MemoryDrive(content)
+    samples = []
+    with tempfile.TemporaryDirectory() as tmp:
+        destination = Path(tmp) / entry.name
+        for _ in range(runs):
+            started = time.perf_counter()
+            gdrive_sync.download_file(service, entry, destination, Path(tmp) / "partial", chunk_size)
+            samples.append(time.perf_counter() - started)
+            destination.unlink()
+    return statistics.median(samples)
+
+
+def time_workers(content: bytes, files: int, workers: int, chunk_size: int, latency: float) -> float:
+    """Return the seconds download_files takes to fetch `files` copies of content."""
+    entries = [make_entry(content, f"file{index:04d}") for index in range(files)]
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        results = list(
+            gdrive_sync.download_files(
+                _MemoryDrive(content, latency),
+                entries,
+                Path(tmp),
+                workers,
+                lambda: _MemoryDrive(content, latency),
+                chunk_size,
+            )
+        )
+        elapsed = time.perf_counter() - started
+    failed = [entry.name for entry, error in results if error is not None]
+    assert not failed, f"downloads failed: {failed}"
+    return elapsed
+
+
+def measure_rss(size_mb: int, chunk_size_mb: int) -> None:
+    """Download a generated file and print the peak RSS before and after, in MB."""
+    gdrive_sync.drive_requests.requests_per_second = 0
+    gdrive_sync._import_google_clients()  # A sync has them loaded before any download.
+    content = _PatternContent(size_mb * 1024 * 1024)
+    entry = make_entry(content)
+    with tempfile.TemporaryDirectory() as tmp:
+        before = gdrive_sync._peak_rss_mb()
+        gdrive_sync.download_file(
+            _MemoryDrive(content), entry, Path(tmp) / entry.name, Path(tmp) / "partial",
+            chunk_size_mb * 1024 * 1024,
+        )
+        print(before, gdrive_sync._peak_rss_mb())
+
+
+def rss_growth(size_mb: int, chunk_size_mb: int) -> float:
+    """Return how many MB downloading raised the peak RSS of a fresh process."""
+    result = subprocess.run(
+        [sys.executable, __file__, "--measure-rss", str(size_mb), str(chunk_size_mb)],
+        check=True, capture_output=True, text=True,
+    )
+    before, after = map(float, result.stdout.split())
+    return after - before
+
+
+def parse_sizes(value: str) -> List[int]:
+    return [int(size) for size in value.split(",")]
+
+
+def time_md5(content: bytes, chunk_size: int, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        digest = hashlib.md5()
+        for start in range(0, len(content), chunk_size):
+            digest.update(content[start:start + chunk_size])
+        digest.hexdigest()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure download verification cost.")
+    parser.add_argument("--size-mb", type=int, default=64, help="Size of the test file.")
+    parser.add_argument(
+        "--chunk-size-mb", type=int, default=gdrive_sync.DEFAULT_CHUNK_SIZE_MB, help="Bytes per ranged GET."
+    )
+    parser.add_argument(
+        "--link-mbps", type=float, default=50.0, help="Network speed to compare against, in Mbit/s."
+    )
+    parser.add_argument("--runs", type=int, default=3, help="Runs per measurement.")
+    parser.add_argument(
+        "--latency-ms", type=float, default=0.0, help="Delay per ranged GET; enables the worker comparison."
+    )
+    parser.add_argument("--workers", type=int, default=4, help="Download workers to compare with one.")
+    parser.add_argument("--files", type=int, default=40, help="Files fetched in the worker comparison.")
+    parser.add_argument("--file-kb", type=int, default=512, help="Size of each of those files.")
+    parser.add_argument("--memory", action="store_true", help="Measure peak RSS across file and chunk sizes.")
+    parser.add_argument(
+        "--memory-sizes-mb", type=parse_sizes, default=[16, 64, 256], help="Comma-separated file sizes."
+    )
+    parser.add_argument(
+        "--memory-chunks-mb", type=parse_sizes, default=[1, 4, 16], help="Comma-separated chunk sizes."
+    )
+    parser.add_argument("--measure-rss", type=int, nargs=2, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def print_memory(sizes_mb: List[int], chunks_mb: List[int]) -> None:
+    print("Peak RSS added by download_file, in MB:")
+    print("  file size " + "".join(f"{f'{chunk} MB chunks':>16}" for chunk in chunks_mb))
+    for size_mb in sizes_mb:
+        growth = "".join(f"{rss_growth(size_mb, chunk_mb):16.1f}" for chunk_mb in chunks_mb)
+        print(f"  {f'{size_mb} MB':>9} {growth}")
+
+
+def main() -> None:
+    args = parse_args()
+    if args.measure_rss:
+        measure_rss(*args.measure_rss)
+        return
+    if args.memory:
+        print_memory(args.memory_sizes_mb, args.memory_chunks_mb)
+        return
+    gdrive_sync.drive_requests.requests_per_second = 0
+    content = os.urandom(args.size_mb * 1024 * 1024)
+    chunk_size = args.chunk_size_mb * 1024 * 1024
+
+    download = time_download(content, chunk_size, args.runs)
+    md5 = time_md5(content, chunk_size, args.runs)
+    network = len(content) * 8 / (args.link_mbps * 1_000_000)
+    print(f"{args.size_mb} MB in {args.chunk_size_mb} MB chunks:")
+    print(f"  download_file (local, incl. MD5)  {download * 1000:8.0f} ms  {args.size_mb / download:7.1f} MB/s")
+    print(f"  MD5 alone                         {md5 * 1000:8.0f} ms  {args.size_mb / md5:7.1f} MB/s")
+    print(f"  network at {args.link_mbps:g} Mbit/s             {network * 1000:8.0f} ms")
+    print(f"  MD5 share of a network download: {md5 / (network + download):.1%}")
+
+    if args.latency_ms > 0:
+        latency = args.latency_ms / 1000
+        small = os.urandom(args.file_kb * 1024)
+        serial = time_workers(small, args.files, 1, chunk_size, latency)
+        pooled = time_workers(small, args.files, args.workers, chunk_size, latency)
+        print(f"{args.files} files of {args.file_kb} KB, {args.latency_ms:g} ms per request:")
+        print(f"  {'1 worker':<34}{serial * 1000:8.0f} ms")
+        print(f"  {f'{args.workers} workers':<34}{pooled * 1000:8.0f} ms  {serial / pooled:5.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
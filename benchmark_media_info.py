@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Measure the player's cycle setup time for many videos, with and without
+the media info the sync records.
+
+A cycle's setup is listing the media directory and working out each
+video's playback timeout. Cold is what a player without the cache does,
+one ffprobe per video per cycle; warm reads the durations the sync wrote
+to media_info.json after probing each video once. Videos are copies of
+--sample, a short clip generated with ffmpeg, or (without ffmpeg)
+placeholder files, in which case only the warm path is measured. Run it
+on the Pi after changing how the player finds its videos.
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
+PROJECT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(PROJECT_DIR))
+
+import gdrive_sync  # noqa: E402
+import media_player  # noqa: E402
+
+# Stands in for a probe when ffprobe is not installed.
+PLACEHOLDER_PROBE = {"codec_name": "h264", "width": 1920, "height": 1080, "duration": 2.0}
+
+
+def make_sample(directory: Path) -> Optional[Path]:
+    if not shutil.which("ffmpeg"):
+        return None
+    sample = directory / "sample.mp4"
+    subprocess.run(
+        [
+            "ffmpeg", "-v", "error", "-f", "lavfi", "-i", "testsrc=duration=2:size=640x360:rate=25",
+            "-c:v", "libx264", "-pix_fmt", "yuv420p", str(sample),
+        ],
+        check=True,
+    )
+    return sample
+
+
+def make_videos(media_dir: Path, count: int, sample: Optional[Path]) -> None:
+    for index in range(count):
+        path = media_dir / f"clip-{index:05d}.mp4"
+        if sample is not None:
+            os.link(sample, path)
+        else:
+            path.write_bytes(b"\0" * 1024)
+
+
+def record_sync_state(media_dir: Path, placeholder: bool) -> float:
+    """Write media_info.json the way a sync does; return the seconds it took."""
+    state = gdrive_sync.SyncState.for_media_dir(media_dir)
+    manifest = {}
+    for index, path in enumerate(sorted(media_dir.glob("*.mp4"))):
+        stat = path.stat()
+        md5 = f"{index:032x}"  # Distinct, so every video is probed.
+        manifest[path.name] = gdrive_sync.ManifestEntry(
+            path.name, path.name, path.name, md5, stat.st_size, stat.st_mtime, stat.st_ino, stat.st_mtime
+        )
+        if placeholder:
+            state.record_video_probe(md5, PLACEHOLDER_PROBE)
+    started = time.perf_counter()
+    gdrive_sync._update_media_info(media_dir, state, manifest, set(manifest), {})
+    elapsed = time.perf_counter() - started
+    state.commit()
+    state.close()
+    return elapsed
+
+
+def cold_setup(media_dir: Path) -> List[float]:
+    _, videos = media_player.categorize_media_files(media_dir)
+    timeouts = []
+    for video in videos:
+        probe = gdrive_sync._probe_video(video) or {}
+        timeouts.append(probe.get("duration") or media_player.DEFAULT_VIDEO_TIMEOUT)
+    return timeouts
+
+
+def warm_setup(media_dir: Path, media_info: media_player.MediaInfo) -> List[float]:
+    _, videos = media_player.categorize_media_files(media_dir)
+    media_info.refresh()
+    return [media_player.video_timeout(video, media_info) for video in videos]
+
+
+def median_seconds(action: Callable[[], List[float]], runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        action()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure player cycle setup with and without media info.")
+    parser.add_argument("--videos", type=int, default=1000, help="Videos in the media directory.")
+    parser.add_argument("--sample", type=Path, help="Video to copy (default: a generated 2-second clip).")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per measurement.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        media_dir = Path(tmp) / "media"
+        media_dir.mkdir()
+        sample = args.sample or make_sample(Path(tmp))
+        real_videos = sample is not None and shutil.which("ffprobe") is not None
+        make_videos(media_dir, args.videos, sample)
+
+        print(f"{args.videos:,} videos:")
+        if real_videos:
+            cold = median_seconds(lambda: cold_setup(media_dir), args.runs)
+            print(f"  cold: ffprobe per video, every cycle  {cold * 1000:9.1f} ms")
+        else:
+            print("  cold: skipped (needs ffprobe and a sample video or ffmpeg)")
+
+        populate = record_sync_state(media_dir, placeholder=not real_videos)
+        print(f"  sync: probe new videos once          {populate * 1000:9.1f} ms")
+
+        first = median_seconds(lambda: warm_setup(media_dir, media_player.MediaInfo(media_dir)), args.runs)
+        media_info = media_player.MediaInfo(media_dir)
+        timeouts = warm_setup(media_dir, media_info)
+        later = median_seconds(lambda: warm_setup(media_dir, media_info), args.runs)
+        assert media_player.DEFAULT_VIDEO_TIMEOUT not in timeouts, "media info did not cover every video"
+        print(f"  warm: first cycle (reads the file)    {first * 1000:9.1f} ms")
+        print(f"  warm: later cycles                    {later * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Measure the memory a Drive listing takes once it is held as DriveFile objects.
+
+Builds synthetic listings of 10k and 100k files the way a full sync does,
+one 1000-item page at a time, and reports the peak RSS each one adds to the
+process. The compact DriveFile is compared with the previous layout (a
+regular dataclass holding a parsed datetime) so the saving stays visible.
+Each measurement runs in a fresh interpreter; run it on the Pi after
+changing what a listing keeps per file.
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+PROJECT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(PROJECT_DIR))
+
+import gdrive_sync  # noqa: E402
+
+PAGE_SIZE = 1000
+LAYOUTS = ("dataclass", "compact")
+
+
+@dataclass
+class DataclassDriveFile:
+    """DriveFile as it was before it was slotted."""
+
+    file_id: str
+    name: str
+    modified_time: datetime
+    mime_type: str
+    md5_checksum: Optional[str]
+    size: Optional[int] = None
+    parent_id: Optional[str] = None
+    folder_path: str = ""
+    local_name: str = ""
+
+
+def _dataclass_from_item(item: dict, folder_path: str = "") -> DataclassDriveFile:
+    return DataclassDriveFile(
+        file_id=item["id"],
+        name=item["name"],
+        mime_type=item["mimeType"],
+        modified_time=datetime.fromisoformat(item["modifiedTime"].replace("Z", "+00:00")),
+        md5_checksum=item.get("md5Checksum"),
+        size=int(item["size"]) if "size" in item else None,
+        parent_id=(item.get("parents") or [None])[0],
+        folder_path=folder_path,
+    )
+
+
+def synthetic_pages(count: int) -> Iterator[List[dict]]:
+    """Yield files.list pages shaped like Drive's.
+
+    Pages go through JSON like a real response, so every item gets its own
+    string objects, including the repeated MIME types and parent IDs.
+    """
+    for start in range(0, count, PAGE_SIZE):
+        page = [
+            {
+                "id": f"1{index:032d}",
+                "name": f"clip-{index:06d}.mp4",
+                "mimeType": "video/mp4" if index % 3 else "image/jpeg",
+                "modifiedTime": f"2024-{index % 12 + 1:02d}-01T12:{index % 60:02d}:00.{index % 1000:03d}Z",
+                "md5Checksum": f"{index:032x}",
+                "size": str(1_000_000 + index),
+                "parents": ["1rootfolder000000000000000000000"],
+            }
+            for index in range(start, min(start + PAGE_SIZE, count))
+        ]
+        yield json.loads(json.dumps(page))
+
+
+def peak_rss_kb() -> int:
+    # ru_maxrss is in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def measure(layout: str, count: int) -> int:
+    """Return the peak RSS in KB that holding count files adds (child process)."""
+    convert = _dataclass_from_item if layout == "dataclass" else gdrive_sync._drive_file_from_item
+    before = peak_rss_kb()
+    files = [convert(item) for page in synthetic_pages(count) for item in page]
+    used = peak_rss_kb() - before
+    assert len(files) == count
+    return used
+
+
+def run_child(layout: str, count: int) -> int:
+    result = subprocess.run(
+        [sys.executable, __file__, "--child", layout, str(count)],
+        stdout=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    return int(result.stdout.strip())
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure memory held by a Drive listing.")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000], help="Listing sizes to measure."
+    )
+    parser.add_argument("--child", nargs=2, metavar=("LAYOUT", "COUNT"), help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.child:
+        layout, count = args.child
+        print(measure(layout, int(count)))
+        return
+
+    for count in args.sizes:
+        used = {layout: run_child(layout, count) for layout in LAYOUTS}
+        saving = 1 - used["compact"] / used["dataclass"] if used["dataclass"] else 0.0
+        print(
+            f"{count:>7,} files: dataclass {used['dataclass'] / 1024:6.1f} MB, "
+            f"compact {used['compact'] / 1024:6.1f} MB "
+            f"({used['compact'] * 1024 / count:.0f} bytes/file, {saving:.0%} less)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Compare image transition latency and CPU of the player's image backends.
+
+The pygame renderer runs headless on SDL's dummy video driver: for each
+image it reports how long after the swap was due the new frame was on
+screen, and the CPU the player process spent per image. The feh path is
+measured the way the player uses it, one feh process per slideshow, under
+xvfb-run when feh and xvfb-run are installed; its per-image overhead is the
+run time beyond the slideshow delays. Run it on the Pi with the media you
+actually show, or let it generate full-HD test images.
+"""
+
+import argparse
+import os
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+PROJECT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(PROJECT_DIR))
+
+import media_player  # noqa: E402
+
+
+def cpu_seconds(who: int) -> float:
+    usage = resource.getrusage(who)
+    return usage.ru_utime + usage.ru_stime
+
+
+def make_test_images(directory: Path, count: int, size: Tuple[int, int]) -> List[Path]:
+    import pygame
+
+    paths = []
+    for index in range(count):
+        surface = pygame.Surface(size)
+        for y in range(0, size[1], 8):
+            shade = (index * 40 + y) % 256
+            surface.fill((shade, 255 - shade, (shade * 3) % 256), (0, y, size[0], 8))
+        path = directory / f"test-{index:02d}.jpg"
+        pygame.image.save(surface, str(path))
+        paths.append(path)
+    return paths
+
+
+def measure_pygame(images: List[Path], delay: float, cycles: int) -> None:
+    renderer = media_player.PygameRenderer()
+    try:
+        started_cpu = cpu_seconds(resource.RUSAGE_SELF)
+        for _ in range(cycles):
+            renderer.show(images, delay, lambda: False)
+        used_cpu = cpu_seconds(resource.RUSAGE_SELF) - started_cpu
+    finally:
+        renderer.close()
+
+    latencies = renderer.transition_latencies
+    # The very first frame is decoded on demand; every later one was preloaded.
+    steady = latencies[1:] or latencies
+    print(f"pygame renderer ({os.environ['SDL_VIDEODRIVER']} driver, {renderer.size[0]}x{renderer.size[1]}):")
+    print(f"  first frame           {latencies[0] * 1000:8.1f} ms")
+    print(f"  transition median     {statistics.median(steady) * 1000:8.1f} ms")
+    print(f"  transition max        {max(steady) * 1000:8.1f} ms")
+    print(f"  CPU per image         {used_cpu / len(latencies) * 1000:8.1f} ms")
+
+
+def measure_feh(images: List[Path], delay: float, cycles: int) -> None:
+    if not (shutil.which("feh") and shutil.which("xvfb-run")):
+        print("feh path: skipped (needs feh and xvfb-run)")
+        return
+    command = [
+        "xvfb-run", "-a",
+        *media_player.FEH_BASE_CMD,
+        "--cycle-once",
+        "--slideshow-delay", str(delay),
+        *(str(path) for path in images),
+    ]
+    started_cpu = cpu_seconds(resource.RUSAGE_CHILDREN)
+    overheads = []
+    for _ in range(cycles):
+        started = time.monotonic()
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        overheads.append(time.monotonic() - started - delay * len(images))
+    used_cpu = cpu_seconds(resource.RUSAGE_CHILDREN) - started_cpu
+
+    print("feh (one process per slideshow, under xvfb-run):")
+    print(f"  overhead per cycle    {statistics.median(overheads) * 1000:8.1f} ms")
+    print(f"  overhead per image    {statistics.median(overheads) / len(images) * 1000:8.1f} ms")
+    print(f"  CPU per image         {used_cpu / (cycles * len(images)) * 1000:8.1f} ms")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure image transition latency and CPU.")
+    parser.add_argument("--media-dir", type=Path, help="Images to show (default: generated test images).")
+    parser.add_argument("--count", type=int, default=6, help="Test images to generate.")
+    parser.add_argument("--delay", type=float, default=0.5, help="Seconds each image is shown.")
+    parser.add_argument("--cycles", type=int, default=3, help="Slideshow cycles per backend.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.media_dir:
+            images, _ = media_player.categorize_media_files(args.media_dir)
+        else:
+            import pygame
+
+            images = make_test_images(Path(tmp), args.count, (1920, 1080))
+            pygame.quit()
+        if not images:
+            raise SystemExit("No images to show.")
+        print(f"{len(images)} images, {args.delay:g}s each, {args.cycles} cycles")
+        measure_pygame(images, args.delay, args.cycles)
+        measure_feh(images, args.delay, args.cycles)
+
+
+if __name__ == "__main__":
+    main()
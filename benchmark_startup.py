@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Measure startup cost of the sync and player entry points.
+
+Reports import time per script (from `python -X importtime`), the wall time
+of `--help`, and the player's time to first frame: how long after launch it
+starts the image viewer, using stub feh/fbi/cvlc commands so no display is
+needed. Run it on the Pi after changing imports or startup code.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+PROJECT_DIR = Path(__file__).resolve().parent
+SYNC_SCRIPT = PROJECT_DIR / "gdrive_sync.py"
+PLAYER_SCRIPT = PROJECT_DIR / "media_player.py"
+
+# A restarted player should have an image on screen within this many seconds
+# on a Raspberry Pi 2 (viewer startup itself not included).
+FIRST_FRAME_TARGET_SECONDS = 1.0
+
+# Modules that must not load for `gdrive_sync.py --help`.
+HEAVY_MODULES = ("googleapiclient", "google.oauth2", "httplib2", "gspread", "multiprocessing")
+
+STUB_VIEWER = """#!/bin/sh
+date +%s.%N > "$STARTUP_BENCH_STAMP"
+"""
+
+
+def import_times(script: Path) -> Tuple[float, List[Tuple[float, str]]]:
+    """Return (total ms, [(cumulative ms, module)]) for running `script --help`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", str(script), "--help"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    total = 0.0
+    modules: List[Tuple[float, str]] = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        cumulative_ms = int(cumulative) / 1000
+        modules.append((cumulative_ms, name.strip()))
+        if not name.startswith("  "):
+            total += cumulative_ms
+    return total, modules
+
+
+def median_wall_time(command: List[str], runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def time_to_first_frame(runs: int) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        bin_dir = tmp_path / "bin"
+        media_dir = tmp_path / "media"
+        bin_dir.mkdir()
+        media_dir.mkdir()
+        (media_dir / "frame.jpg").write_bytes(b"")
+        for viewer in ("feh", "fbi", "cvlc"):
+            stub = bin_dir / viewer
+            stub.write_text(STUB_VIEWER)
+            stub.chmod(0o755)
+
+        stamp = tmp_path / "stamp"
+        env = dict(os.environ)
+        env["PATH"] = f"{bin_dir}{os.pathsep}{env.get('PATH', '')}"
+        env["STARTUP_BENCH_STAMP"] = str(stamp)
+
+        samples = []
+        for _ in range(runs):
+            started = time.time()
+            subprocess.run(
+                [sys.executable, str(PLAYER_SCRIPT), "--once", "--media-dir", str(media_dir)],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                env=env,
+                check=True,
+            )
+            samples.append(float(stamp.read_text().strip()) - started)
+        return statistics.median(samples)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure sync and player startup time.")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per wall-clock measurement.")
+    parser.add_argument("--top", type=int, default=8, help="Slowest imports to list per script.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    failed = False
+
+    for script in (SYNC_SCRIPT, PLAYER_SCRIPT):
+        total, modules = import_times(script)
+        wall = median_wall_time([sys.executable, str(script), "--help"], args.runs)
+        print(f"{script.name}: imports {total:.1f} ms, `--help` {wall * 1000:.0f} ms")
+        for cumulative_ms, name in sorted(modules, reverse=True)[: args.top]:
+            print(f"  {cumulative_ms:8.1f} ms  {name}")
+
+        loaded = {name for _, name in modules}
+        heavy = [
+            name for name in loaded
+            if any(name == module or name.startswith(module + ".") for module in HEAVY_MODULES)
+        ]
+        if heavy:
+            print(f"  heavy modules imported for --help: {', '.join(sorted(heavy))}")
+            failed = True
+
+    ttff = time_to_first_frame(args.runs)
+    verdict = "ok" if ttff <= FIRST_FRAME_TARGET_SECONDS else "OVER TARGET"
+    print(
+        f"media_player.py time to first frame: {ttff * 1000:.0f} ms "
+        f"(target {FIRST_FRAME_TARGET_SECONDS * 1000:.0f} ms, {verdict})"
+    )
+    failed = failed or ttff > FIRST_FRAME_TARGET_SECONDS
+
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
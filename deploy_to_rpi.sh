@@ -79,6 +79,7 @@ create_expect_scp "gdrive_sync.py" "${REMOTE_DIR}/"
 create_expect_scp "media_player.py" "${REMOTE_DIR}/"
 create_expect_scp "gdrive-sync.service" "${REMOTE_DIR}/"
 create_expect_scp "gdrive-sync.timer" "${REMOTE_DIR}/"
+create_expect_scp "gdrive-sync-daemon.service" "${REMOTE_DIR}/"
 create_expect_scp "media-player.service" "${REMOTE_DIR}/"
 create_expect_scp "setup_pi.sh" "${REMOTE_DIR}/"
 create_expect_scp "README.md" "${REMOTE_DIR}/"
@@ -7,36 +7,59 @@ to keep a local media directory in sync with a Google Drive folder.
 """
 
 import argparse
-import io
+import hashlib
+import json
 import logging
 import os
+import queue
+import random
+import resource
+import shutil
+import signal
+import sqlite3
+import subprocess
+import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 try:
     from dotenv import load_dotenv
 except ImportError:
     load_dotenv = None
 
-try:
-    from google.oauth2 import service_account
-    from googleapiclient.discovery import build
-    from googleapiclient.errors import HttpError
-    from googleapiclient.http import MediaIoBaseDownload
-except ImportError as exc:
-    missing = (
-        "Missing Google API libraries. Install them with:\n"
-        "  pip install google-api-python-client google-auth-httplib2 google-auth-oauthlib\n"
-    )
-    raise SystemExit(missing) from exc
+# Taken before the Google client libraries load so startup cost can be reported.
+PROCESS_STARTED = time.monotonic()
 
-try:
-    import gspread
-except ImportError:
-    gspread = None
+# The Google client libraries dominate startup time, so they are imported by
+# _import_google_clients() only once a sync is about to run; --help and
+# configuration errors exit without loading them. Functions that catch or
+# raise HttpError call it first, so they also work before a sync has run.
+httplib2 = None
+service_account = None
+build = None
+HttpError = None
+
+
+def _import_google_clients() -> None:
+    global httplib2, service_account, build, HttpError
+    if build is not None:
+        return
+    try:
+        import httplib2
+        from google.oauth2 import service_account
+        from googleapiclient.discovery import build
+        from googleapiclient.errors import HttpError
+    except ImportError as exc:
+        missing = (
+            "Missing Google API libraries. Install them with:\n"
+            "  pip install google-api-python-client google-auth-httplib2 google-auth-oauthlib\n"
+        )
+        raise SystemExit(missing) from exc
 
 
 # --- Configuration ---------------------------------------------------------
@@ -54,22 +77,150 @@ DEFAULT_CREDENTIALS_PATH = Path(__file__).resolve().parent / "credentials.json"
 DEFAULT_LOG_DIR = Path(__file__).resolve().parent / "logs"
 DEFAULT_LOG_RETENTION_DAYS = 3
 DEFAULT_HISTORY_RETENTION_DAYS = 90
+DEFAULT_DOWNLOAD_WORKERS = 4
+DEFAULT_SYNC_INTERVAL_SECONDS = 300
+LOG_CLEANUP_INTERVAL_SECONDS = 24 * 60 * 60
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+# Sync state lives inside the media directory so it is discarded together with
+# the files it describes. Hidden so the player never treats it as media.
+STATE_DIRNAME = ".gdrive2video"
+STATE_DB_NAME = "sync_state.sqlite3"
+PARTIAL_DIRNAME = "partial"
+# Parent IDs per files.list query when walking subfolders. Drive rejects
+# very long queries, so keep each "'a' in parents or ..." clause modest.
+FOLDER_BATCH_SIZE = 20
+BLOB_DIRNAME = "blobs"
+# Display-size copies of images; the player reads RENDITION_INDEX_NAME to find them.
+RENDITION_DIRNAME = "renditions"
+RENDITION_INDEX_NAME = "index.json"
+# Images worth scaling down ahead of time; GIFs may be animated, so they are left alone.
+RENDITION_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+# Same as media_player.VIDEO_EXTENSIONS.
+VIDEO_EXTENSIONS = {".mp4", ".mov", ".mkv", ".avi", ".webm"}
+# H.264 profiles the Raspberry Pi's hardware decoder handles.
+H264_HARDWARE_PROFILES = {"Constrained Baseline", "Baseline", "Main", "High"}
+# Duration, resolution and codec of each synced video, read by the player.
+MEDIA_INFO_NAME = "media_info.json"
+# Concurrent ffprobe processes when probing newly downloaded videos.
+PROBE_WORKERS = 4
+TOKEN_CACHE_NAME = "drive_token.json"
+# Cached tokens this close to expiry are not reused.
+TOKEN_EXPIRY_MARGIN = timedelta(minutes=5)
+DEFAULT_CHUNK_SIZE_MB = 4
+# Tries per file when a download does not match Drive's size or md5Checksum.
+DOWNLOAD_VERIFY_ATTEMPTS = 2
+DEFAULT_MAX_REQUESTS_PER_SECOND = 10.0
+DEFAULT_MAX_RETRIES = 6
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+# Drive reports quota exhaustion as a 403 with one of these reasons.
+RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+# Download errors that will recur until the file itself changes in Drive.
+# Other 4xx reasons, such as downloadQuotaExceeded, clear up on their own.
+PERMANENT_FAILURE_STATUSES = {404}
+PERMANENT_FAILURE_REASONS = {"fileNotDownloadable", "cannotDownloadAbusiveFile"}
+# Only these MIME types are listed; a trailing "/" matches the whole family.
+DEFAULT_MIME_TYPES = "image/,video/"
 
 
-@dataclass
 class DriveFile:
-    """Minimal metadata we care about for syncing."""
+    """Minimal metadata we care about for syncing.
+
+    A listing of a large shared folder holds one of these per file, so they
+    are slotted and keep the modification time as epoch seconds; the
+    datetime is only built when asked for.
+    """
+
+    __slots__ = (
+        "file_id",
+        "name",
+        "modified_ts",
+        "mime_type",
+        "md5_checksum",
+        "size",
+        "parent_id",
+        "folder_path",
+        "local_name",
+    )
 
-    file_id: str
-    name: str
-    modified_time: datetime
-    mime_type: str
-    md5_checksum: Optional[str]
+    def __init__(
+        self,
+        file_id: str,
+        name: str,
+        modified_ts: float,
+        mime_type: str,
+        md5_checksum: Optional[str],
+        size: Optional[int] = None,
+        parent_id: Optional[str] = None,
+        folder_path: str = "",  # relative to the synced root folder
+        local_name: str = "",
+    ):
+        self.file_id = file_id
+        self.name = name
+        self.modified_ts = modified_ts
+        # A listing repeats a few MIME types and parent IDs, so share the strings.
+        self.mime_type = sys.intern(mime_type)
+        self.md5_checksum = md5_checksum
+        self.size = size
+        self.parent_id = sys.intern(parent_id) if parent_id else parent_id
+        self.folder_path = folder_path
+        # Set by LocalPathAssigner when another file in the folder has the same name.
+        self.local_name = local_name
+
+    def __repr__(self) -> str:
+        return f"DriveFile(file_id={self.file_id!r}, name={self.name!r}, folder_path={self.folder_path!r})"
+
+    @property
+    def modified_time(self) -> datetime:
+        return datetime.fromtimestamp(self.modified_ts, timezone.utc)
 
     @property
     def extension(self) -> str:
         return Path(self.name).suffix.lower()
 
+    @property
+    def local_path(self) -> str:
+        """Path of this file relative to the media directory."""
+        name = self.local_name or _safe_name(self.name)
+        return f"{self.folder_path}/{name}" if self.folder_path else name
+
+    def disambiguated_name(self) -> str:
+        """The local name with a short file-ID suffix: "clip~1AbCdEfG.mp4"."""
+        stem, suffix = os.path.splitext(_safe_name(self.name))
+        return f"{stem}~{self.file_id[:8]}{suffix}"
+
+
+@dataclass
+class SyncOptions:
+    """How sync_drive_folder behaves; the defaults are a plain one-shot sync."""
+
+    incremental: bool = False
+    recursive: bool = False
+    dedupe: bool = False
+    workers: int = 1
+    # Builds one Drive service per worker thread; without it work is sequential.
+    service_factory: Optional[Callable[[], object]] = None
+    # Bytes requested per ranged GET, which bounds download memory per worker.
+    chunk_size: int = DEFAULT_CHUNK_SIZE_MB * 1024 * 1024
+    # MIME types to sync (see parse_mime_types); empty syncs everything.
+    mime_types: Tuple[str, ...] = tuple(DEFAULT_MIME_TYPES.split(","))
+    # Local copy of the media (USB stick, another Pi) to take content from first.
+    seed: Optional["SeedDirectory"] = None
+    # (width, height) of the display; images larger than this get a scaled copy.
+    rendition_size: Optional[Tuple[int, int]] = None
+    # Transcodes videos the display cannot decode in hardware, in the background.
+    transcoder: Optional["VideoTranscoder"] = None
+    # Set to end the sync early (daemon shutdown); work done so far is kept.
+    stop: Optional[threading.Event] = None
+
+    def stop_requested(self) -> bool:
+        return self.stop is not None and self.stop.is_set()
+
+
+def _safe_name(name: str) -> str:
+    """Drive names may contain "/"; never let one escape its folder."""
+    name = name.replace("/", "_").replace("\0", "_")
+    return "_" if name in ("", ".", "..") else name
+
 
 def configure_logging(verbose: bool, log_dir: Optional[Path] = None) -> None:
     level = logging.DEBUG if verbose else logging.INFO
@@ -141,26 +292,273 @@ def cleanup_log_file(log_file: Path, retention_days: int, log_name: str) -> None
             temp_log.unlink()
 
 
-def load_drive_service(credentials_path: Path) -> "build":
+def load_drive_credentials(
+    credentials_path: Path, token_cache: Optional[Path] = None
+) -> "service_account.Credentials":
+    """Load service account credentials, reusing a cached access token if possible.
+
+    A token reused from token_cache means the first Drive request skips the
+    JWT signing and token exchange; google-auth refreshes it as usual once it
+    nears expiry.
+    """
+    _import_google_clients()
     creds = service_account.Credentials.from_service_account_file(
         credentials_path,
         scopes=SCOPES,
     )
+    if token_cache is not None:
+        _restore_cached_token(creds, token_cache)
+    return creds
+
+
+def _utcnow() -> datetime:
+    # google-auth compares expiry against naive UTC datetimes.
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _restore_cached_token(creds, token_cache: Path) -> None:
+    try:
+        with token_cache.open("r", encoding="utf-8") as handle:
+            cached = json.load(handle)
+        token = cached["token"]
+        expiry = datetime.fromtimestamp(float(cached["expiry"]), timezone.utc).replace(tzinfo=None)
+    except FileNotFoundError:
+        return
+    except (OSError, ValueError, KeyError, TypeError) as exc:
+        logging.debug("Ignoring unreadable token cache %s: %s", token_cache, exc)
+        return
+
+    if cached.get("client_email") != creds.service_account_email or cached.get("scopes") != SCOPES:
+        logging.debug("Token cache belongs to different credentials; ignoring it")
+        return
+    if expiry - TOKEN_EXPIRY_MARGIN <= _utcnow():
+        logging.debug("Cached access token expires at %s; requesting a new one", expiry)
+        return
+    creds.token = token
+    creds.expiry = expiry
+    logging.debug("Reusing cached access token (expires %s UTC)", expiry)
+
+
+def save_cached_token(creds, token_cache: Path) -> None:
+    """Persist the current access token and expiry, readable by the owner only."""
+    if not creds.token or not creds.expiry:
+        return
+    cached = {
+        "client_email": creds.service_account_email,
+        "scopes": SCOPES,
+        "token": creds.token,
+        "expiry": creds.expiry.replace(tzinfo=timezone.utc).timestamp(),
+    }
+    try:
+        with token_cache.open("r", encoding="utf-8") as handle:
+            if json.load(handle) == cached:
+                return
+    except (OSError, ValueError):
+        pass
+
+    try:
+        token_cache.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = token_cache.with_name(token_cache.name + ".tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            os.fchmod(handle.fileno(), 0o600)
+            json.dump(cached, handle)
+        os.replace(tmp_path, token_cache)
+    except OSError as exc:
+        # Only costs a token exchange on the next run.
+        logging.warning("Could not save access token cache %s: %s", token_cache, exc)
+
+
+def build_drive_service(creds) -> "build":
+    _import_google_clients()
     return build("drive", "v3", credentials=creds, cache_discovery=False)
 
 
-def list_drive_files(service, folder_id: str) -> List[DriveFile]:
-    query = f"'{folder_id}' in parents and trashed = false"
+def load_drive_service(credentials_path: Path) -> "build":
+    return build_drive_service(load_drive_credentials(credentials_path))
+
+
+def make_service_factory(creds) -> Callable[[], object]:
+    """Return a factory that hands each worker thread its own Drive service.
+
+    Services are cached by thread name. Our executors name their threads
+    (download_0, listing_1, ...), so in daemon mode every cycle's workers get
+    back a warm service with its HTTP connection still open.
+    """
+    services: Dict[str, object] = {}
+    lock = threading.Lock()
+
+    def factory() -> object:
+        name = threading.current_thread().name
+        with lock:
+            if name not in services:
+                services[name] = build_drive_service(creds)
+            return services[name]
+
+    return factory
+
+
+class RequestScheduler:
+    """Shared gate for every Drive API call.
+
+    Spaces calls out to at most requests_per_second across all threads and
+    retries transient failures (429, 5xx, 403 rate limit errors and network
+    errors) with jittered exponential backoff, honouring Retry-After.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float = DEFAULT_MAX_REQUESTS_PER_SECOND,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        base_delay: float = 1.0,
+        max_delay: float = 64.0,
+    ):
+        self.requests_per_second = requests_per_second
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def _wait_for_slot(self) -> None:
+        if self.requests_per_second <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + 1.0 / self.requests_per_second
+        if slot > now:
+            time.sleep(slot - now)
+
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        resp = getattr(error, "resp", None)
+        retry_after = resp.get("retry-after") if resp is not None else None
+        if retry_after and str(retry_after).isdigit():
+            delay = max(delay, float(retry_after))
+        return delay
+
+    def call(self, func: Callable[[], Any]) -> Any:
+        _import_google_clients()
+        attempt = 0
+        while True:
+            self._wait_for_slot()
+            try:
+                return func()
+            except HttpError as error:
+                if attempt >= self.max_retries or not _is_retryable(error):
+                    raise
+                reason = error
+            except (OSError, httplib2.HttpLib2Error) as error:
+                if attempt >= self.max_retries:
+                    raise
+                reason = error
+            delay = self._retry_delay(attempt, reason)
+            attempt += 1
+            logging.warning(
+                "Drive request failed (%s); retry %d/%d in %.1fs",
+                reason, attempt, self.max_retries, delay,
+            )
+            time.sleep(delay)
+
+    def execute(self, request) -> Any:
+        return self.call(request.execute)
+
+
+def _is_retryable(error: HttpError) -> bool:
+    status = getattr(getattr(error, "resp", None), "status", None)
+    if status in RETRYABLE_STATUSES:
+        return True
+    return status == 403 and bool(_error_reasons(error) & RATE_LIMIT_REASONS)
+
+
+# All Drive calls go through this instance so workers share one budget.
+drive_requests = RequestScheduler()
+
+
+def _drive_file_from_item(item: dict, folder_path: str = "") -> DriveFile:
+    modified_ts = datetime.fromisoformat(
+        item["modifiedTime"].replace("Z", "+00:00")
+    ).timestamp()
+    return DriveFile(
+        file_id=item["id"],
+        name=item["name"],
+        mime_type=item["mimeType"],
+        modified_ts=modified_ts,
+        md5_checksum=item.get("md5Checksum"),
+        size=int(item["size"]) if "size" in item else None,
+        parent_id=(item.get("parents") or [None])[0],
+        folder_path=folder_path,
+    )
+
+
+def parse_rendition_size(value: str) -> Optional[Tuple[int, int]]:
+    """Parse "1920x1080" into (1920, 1080); an empty value disables renditions."""
+    value = value.strip().lower()
+    if not value:
+        return None
+    try:
+        width, height = (int(part) for part in value.split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {value!r}") from None
+    if width <= 0 or height <= 0:
+        raise argparse.ArgumentTypeError(f"expected a positive size, got {value!r}")
+    return width, height
+
+
+def parse_mime_types(value: str) -> Tuple[str, ...]:
+    """Parse a comma-separated MIME type list; "" or "*" means no filter."""
+    if value.strip() == "*":
+        return ()
+    return tuple(part.strip() for part in value.split(",") if part.strip())
+
+
+def _mime_allowed(mime_type: str, mime_types: Tuple[str, ...]) -> bool:
+    if not mime_types:
+        return True
+    return any(
+        mime_type.startswith(allowed) if allowed.endswith("/") else mime_type == allowed
+        for allowed in mime_types
+    )
+
+
+def _mime_query(mime_types: Tuple[str, ...], include_folders: bool) -> str:
+    """Build the files.list clause matching mime_types (and folders if asked)."""
+    clauses = []
+    for allowed in mime_types:
+        allowed = allowed.replace("\\", "\\\\").replace("'", "\\'")
+        if allowed.endswith("/"):
+            clauses.append(f"mimeType contains '{allowed}'")
+        else:
+            clauses.append(f"mimeType = '{allowed}'")
+    if include_folders:
+        clauses.append(f"mimeType = '{FOLDER_MIME_TYPE}'")
+    return " or ".join(clauses)
+
+
+def _iter_children(
+    service,
+    parent_ids: List[str],
+    mime_types: Tuple[str, ...] = (),
+    include_folders: bool = False,
+) -> Iterator[List[dict]]:
+    """Yield the raw items directly inside any of parent_ids, one page at a time.
+
+    With mime_types set, Drive only returns matching files (plus folders if
+    include_folders), so Docs, Sheets and shortcuts never reach us.
+    """
+    parents = " or ".join(f"'{parent_id}' in parents" for parent_id in parent_ids)
+    query = f"({parents}) and trashed = false"
+    if mime_types:
+        query += f" and ({_mime_query(mime_types, include_folders)})"
     fields = (
-        "nextPageToken, files(id, name, mimeType, modifiedTime, md5Checksum)"
+        "nextPageToken, files(id, name, mimeType, modifiedTime, md5Checksum, size, parents)"
     )
-    files: List[DriveFile] = []
     page_token: Optional[str] = None
 
     while True:
-        response = (
-            service.files()
-            .list(
+        response = drive_requests.execute(
+            service.files().list(
                 q=query,
                 pageSize=1000,
                 fields=fields,
@@ -168,59 +566,857 @@ def list_drive_files(service, folder_id: str) -> List[DriveFile]:
                 supportsAllDrives=True,
                 includeItemsFromAllDrives=True,
             )
-            .execute()
         )
-        for item in response.get("files", []):
-            modified_time = datetime.fromisoformat(
-                item["modifiedTime"].replace("Z", "+00:00")
-            )
-            files.append(
-                DriveFile(
-                    file_id=item["id"],
-                    name=item["name"],
-                    mime_type=item["mimeType"],
-                    modified_time=modified_time,
-                    md5_checksum=item.get("md5Checksum"),
-                )
-            )
+        yield response.get("files", [])
         page_token = response.get("nextPageToken")
         if not page_token:
             break
-    return files
+
+
+def _list_children(
+    service,
+    parent_ids: List[str],
+    mime_types: Tuple[str, ...] = (),
+    include_folders: bool = False,
+) -> List[dict]:
+    return [
+        item
+        for page in _iter_children(service, parent_ids, mime_types, include_folders)
+        for item in page
+    ]
+
+
+def iter_drive_files(
+    service, folder_id: str, mime_types: Tuple[str, ...] = ()
+) -> Iterator[List[DriveFile]]:
+    """Yield the files directly inside folder_id as each listing page arrives."""
+    for page in _iter_children(service, [folder_id], mime_types):
+        yield [_drive_file_from_item(item) for item in page]
+
+
+def list_drive_files(
+    service, folder_id: str, mime_types: Tuple[str, ...] = ()
+) -> List[DriveFile]:
+    return [entry for page in iter_drive_files(service, folder_id, mime_types) for entry in page]
+
+
+def iter_drive_tree(
+    service,
+    folder_id: str,
+    folders: Dict[str, str],
+    workers: int = 1,
+    service_factory: Optional[Callable[[], object]] = None,
+    mime_types: Tuple[str, ...] = (),
+) -> Iterator[List[DriveFile]]:
+    """Yield every file below folder_id, one batch of folders at a time.
+
+    Walks the tree one level at a time. Each level's folders are queried
+    FOLDER_BATCH_SIZE parents per files.list call, and the batches of a
+    level are fetched concurrently. Yielded files have folder_path set;
+    folders is filled in as the walk goes with folder ID -> relative folder
+    path, "" for the root, and is complete once the generator is exhausted.
+    """
+    folders[folder_id] = ""
+    level = [folder_id]
+    local = threading.local()
+
+    def _fetch(batch: List[str]) -> List[dict]:
+        if service_factory is None:
+            return _list_children(service, batch, mime_types, include_folders=True)
+        if not hasattr(local, "service"):
+            local.service = service_factory()
+        return _list_children(local.service, batch, mime_types, include_folders=True)
+
+    with ThreadPoolExecutor(
+        max_workers=max(1, workers) if service_factory else 1, thread_name_prefix="listing"
+    ) as pool:
+        while level:
+            batches = [
+                level[i:i + FOLDER_BATCH_SIZE] for i in range(0, len(level), FOLDER_BATCH_SIZE)
+            ]
+            next_level: List[str] = []
+            for batch, items in zip(batches, pool.map(_fetch, batches)):
+                batch_ids = set(batch)
+                files: List[DriveFile] = []
+                for item in items:
+                    parent_id = next(p for p in item.get("parents", []) if p in batch_ids)
+                    folder_path = folders[parent_id]
+                    if item["mimeType"] != FOLDER_MIME_TYPE:
+                        files.append(_drive_file_from_item(item, folder_path))
+                        continue
+                    if item["id"] in folders:
+                        continue  # Reachable twice; keep the first path.
+                    name = _safe_name(item["name"])
+                    folders[item["id"]] = f"{folder_path}/{name}" if folder_path else name
+                    next_level.append(item["id"])
+                yield files
+            level = next_level
+
+
+def _read_ahead(pages: Iterator[List[DriveFile]]) -> Iterator[List[DriveFile]]:
+    """Consume pages on a background thread while the caller works.
+
+    Yields everything the background thread has listed since the previous
+    yield, waiting only when nothing new has arrived, so listing keeps going
+    while the caller downloads. An exception raised by pages is re-raised
+    here once the pages listed before it have been yielded.
+    """
+    ready: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+    stop = threading.Event()
+
+    def _produce() -> None:
+        try:
+            for page in pages:
+                if stop.is_set():
+                    return
+                ready.put(("page", page))
+        except Exception as error:  # handed to the consumer
+            ready.put(("error", error))
+        else:
+            ready.put(("done", None))
+
+    threading.Thread(target=_produce, name="listing-read-ahead", daemon=True).start()
+    try:
+        while True:
+            batch: List[DriveFile] = []
+            kind, value = ready.get()
+            while True:
+                if kind != "page":
+                    break
+                batch.extend(value)
+                try:
+                    kind, value = ready.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                yield batch
+            if kind == "error":
+                raise value
+            if kind == "done":
+                return
+    finally:
+        stop.set()
+
+
+def get_start_page_token(service) -> str:
+    """Return the Changes feed token representing "now"."""
+    response = drive_requests.execute(
+        service.changes().getStartPageToken(supportsAllDrives=True)
+    )
+    return response["startPageToken"]
+
+
+def list_drive_changes(service, page_token: str) -> Tuple[List[dict], str]:
+    """Fetch every change recorded after page_token.
+
+    Returns the raw change resources in feed order together with the token
+    to store for the next run.
+    """
+    fields = (
+        "nextPageToken, newStartPageToken, changes(fileId, removed, "
+        "file(id, name, mimeType, modifiedTime, md5Checksum, size, trashed, parents))"
+    )
+    changes: List[dict] = []
+
+    while True:
+        response = drive_requests.execute(
+            service.changes().list(
+                pageToken=page_token,
+                pageSize=1000,
+                fields=fields,
+                spaces="drive",
+                includeRemoved=True,
+                supportsAllDrives=True,
+                includeItemsFromAllDrives=True,
+            )
+        )
+        changes.extend(response.get("changes", []))
+        if "newStartPageToken" in response:
+            return changes, response["newStartPageToken"]
+        page_token = response["nextPageToken"]
+
+
+def _error_reasons(error: HttpError) -> set:
+    """Return the "reason" codes of a Drive error response."""
+    try:
+        details = json.loads(error.content or b"{}").get("error") or {}
+        return {item.get("reason") for item in details.get("errors") or []}
+    except (AttributeError, TypeError, ValueError):
+        return set()
+
+
+def _is_permanent_failure(error: Exception) -> bool:
+    """True for download errors retrying will not fix until the file changes."""
+    _import_google_clients()
+    if not isinstance(error, HttpError):
+        return False
+    status = getattr(getattr(error, "resp", None), "status", None)
+    if status in PERMANENT_FAILURE_STATUSES:
+        return True
+    return bool(_error_reasons(error) & PERMANENT_FAILURE_REASONS)
+
+
+def _is_known_failure(entry: DriveFile, failures: Dict[str, float]) -> bool:
+    if failures.get(entry.file_id) != entry.modified_ts:
+        return False
+    logging.debug("Skipping %s: download failed before and it has not changed", entry.name)
+    return True
+
+
+def _is_invalid_page_token(error: HttpError) -> bool:
+    status = getattr(getattr(error, "resp", None), "status", None)
+    return status in (400, 404, 410)
+
+
+@dataclass
+class ManifestEntry:
+    """What we last downloaded for a Drive file and where it lives locally."""
+
+    file_id: str
+    name: str
+    local_path: str  # relative to the media directory
+    md5_checksum: Optional[str]
+    size: Optional[int]
+    remote_mtime: float
+    local_inode: Optional[int]
+    local_mtime: Optional[float]
+
+
+class SyncState:
+    """SQLite-backed manifest that survives between sync runs.
+
+    Records, per Drive file ID, the remote version we last downloaded and the
+    local file it was written to, so change detection is a dictionary lookup
+    rather than a stat() per file. Also holds the Changes feed page token.
+    """
+
+    SCHEMA_VERSION = 3
+    # Bumped when _is_permanent_failure changes, so old verdicts are retried.
+    FAILURE_RULES_VERSION = 2
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(str(path))
+        # In-memory copy of the files table, so a long-running daemon reads
+        # the manifest from disk once rather than every cycle.
+        self._files: Optional[Dict[str, ManifestEntry]] = None
+        self._migrate()
+
+    @classmethod
+    def for_media_dir(cls, media_dir: Path) -> "SyncState":
+        return cls(media_dir / STATE_DIRNAME / STATE_DB_NAME)
+
+    def _migrate(self) -> None:
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+        )
+        if self._get_meta("schema_version") != str(self.SCHEMA_VERSION):
+            # State is only a cache of what Drive already knows; on a schema
+            # change start over and let the next run do a full listing.
+            self._conn.execute("DROP TABLE IF EXISTS files")
+            self._conn.execute("DROP TABLE IF EXISTS folders")
+            self._conn.execute("DROP TABLE IF EXISTS failures")
+            self._conn.execute("DROP TABLE IF EXISTS local_hashes")
+            self._conn.execute("DROP TABLE IF EXISTS renditions")
+            self._conn.execute("DROP TABLE IF EXISTS video_probes")
+            self._conn.execute("DELETE FROM meta")
+            self._set_meta("schema_version", str(self.SCHEMA_VERSION))
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " file_id TEXT PRIMARY KEY,"
+            " name TEXT NOT NULL,"
+            " local_path TEXT NOT NULL,"
+            " md5_checksum TEXT,"
+            " size INTEGER,"
+            " remote_mtime REAL NOT NULL,"
+            " local_inode INTEGER,"
+            " local_mtime REAL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS folders ("
+            " folder_id TEXT PRIMARY KEY,"
+            " path TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS failures ("
+            " file_id TEXT PRIMARY KEY,"
+            " remote_mtime REAL NOT NULL,"
+            " reason TEXT)"
+        )
+        if self._get_meta("failure_rules") != str(self.FAILURE_RULES_VERSION):
+            self._conn.execute("DELETE FROM failures")
+            self._set_meta("failure_rules", str(self.FAILURE_RULES_VERSION))
+        # MD5s of local files, valid while size and mtime are unchanged.
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS local_hashes ("
+            " local_path TEXT PRIMARY KEY,"
+            " size INTEGER NOT NULL,"
+            " mtime REAL NOT NULL,"
+            " md5 TEXT NOT NULL)"
+        )
+        # Per content and target (display size or video profile), the
+        # rendition file name, or NULL when the original is used as it is.
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS renditions ("
+            " md5 TEXT NOT NULL,"
+            " size TEXT NOT NULL,"
+            " filename TEXT,"
+            " PRIMARY KEY (md5, size))"
+        )
+        # ffprobe's JSON description per video content, or NULL if unreadable.
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS video_probes ("
+            " md5 TEXT PRIMARY KEY,"
+            " probe TEXT)"
+        )
+        self._conn.commit()
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute(
+            "SELECT value FROM meta WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: Optional[str]) -> None:
+        if value is None:
+            self._conn.execute("DELETE FROM meta WHERE key = ?", (key,))
+        else:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (key, value),
+            )
+
+    def bind_folder(self, folder_id: str, recursive: bool = False) -> None:
+        """Discard state recorded for a different Drive folder or mode."""
+        if self._get_meta("folder_id") != folder_id:
+            self._conn.execute("DELETE FROM files")
+            self._conn.execute("DELETE FROM folders")
+            self._conn.execute("DELETE FROM failures")
+            self._files = None
+            self._set_meta("page_token", None)
+            self._set_meta("folder_id", folder_id)
+        if self._get_meta("recursive") != str(recursive):
+            # The known folder set no longer matches; relist before using changes.
+            self._set_meta("page_token", None)
+            self._set_meta("recursive", str(recursive))
+        self._conn.commit()
+
+    @property
+    def page_token(self) -> Optional[str]:
+        return self._get_meta("page_token")
+
+    @page_token.setter
+    def page_token(self, value: Optional[str]) -> None:
+        self._set_meta("page_token", value)
+
+    def all_files(self) -> Dict[str, ManifestEntry]:
+        """Return a copy of the manifest; callers may add and remove keys."""
+        if self._files is None:
+            rows = self._conn.execute(
+                "SELECT file_id, name, local_path, md5_checksum, size, remote_mtime,"
+                " local_inode, local_mtime FROM files"
+            )
+            self._files = {row[0]: ManifestEntry(*row) for row in rows}
+        return dict(self._files)
+
+    def record_file(self, record: ManifestEntry) -> None:
+        if self._files is not None:
+            self._files[record.file_id] = record
+        self._conn.execute(
+            "INSERT OR REPLACE INTO files (file_id, name, local_path, md5_checksum,"
+            " size, remote_mtime, local_inode, local_mtime)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                record.file_id,
+                record.name,
+                record.local_path,
+                record.md5_checksum,
+                record.size,
+                record.remote_mtime,
+                record.local_inode,
+                record.local_mtime,
+            ),
+        )
+
+    def folders(self) -> Dict[str, str]:
+        return dict(self._conn.execute("SELECT folder_id, path FROM folders"))
+
+    def replace_folders(self, folders: Dict[str, str]) -> None:
+        self._conn.execute("DELETE FROM folders")
+        self._conn.executemany(
+            "INSERT INTO folders (folder_id, path) VALUES (?, ?)", folders.items()
+        )
+
+    def forget_file(self, file_id: str) -> None:
+        if self._files is not None:
+            self._files.pop(file_id, None)
+        self._conn.execute("DELETE FROM files WHERE file_id = ?", (file_id,))
+        self._conn.execute("DELETE FROM failures WHERE file_id = ?", (file_id,))
+
+    def failures(self) -> Dict[str, float]:
+        """Map file ID -> remote mtime of files that failed permanently."""
+        return dict(self._conn.execute("SELECT file_id, remote_mtime FROM failures"))
+
+    def record_failure(self, file_id: str, remote_mtime: float, reason: str) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO failures (file_id, remote_mtime, reason) VALUES (?, ?, ?)",
+            (file_id, remote_mtime, reason),
+        )
+
+    def clear_failure(self, file_id: str) -> None:
+        self._conn.execute("DELETE FROM failures WHERE file_id = ?", (file_id,))
+
+    def prune_failures(self, remote_ids: set) -> None:
+        """Drop failures for files that are no longer in the folder."""
+        stale = [file_id for file_id in self.failures() if file_id not in remote_ids]
+        self._conn.executemany(
+            "DELETE FROM failures WHERE file_id = ?", [(file_id,) for file_id in stale]
+        )
+
+    def local_md5(self, local_path: str, size: int, mtime: float) -> Optional[str]:
+        """Return the cached MD5 of local_path if it has not changed since."""
+        row = self._conn.execute(
+            "SELECT md5 FROM local_hashes WHERE local_path = ? AND size = ? AND mtime = ?",
+            (local_path, size, mtime),
+        ).fetchone()
+        return row[0] if row else None
+
+    def record_local_md5(self, local_path: str, size: int, mtime: float, md5: str) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO local_hashes (local_path, size, mtime, md5) VALUES (?, ?, ?, ?)",
+            (local_path, size, mtime, md5),
+        )
+
+    def prune_local_hashes(self, local_paths: set) -> None:
+        """Drop cached MD5s of files that are no longer on disk."""
+        stale = [
+            path for (path,) in self._conn.execute("SELECT local_path FROM local_hashes")
+            if path not in local_paths
+        ]
+        self._conn.executemany(
+            "DELETE FROM local_hashes WHERE local_path = ?", [(path,) for path in stale]
+        )
+
+    def renditions(self, size: str) -> Dict[str, Optional[str]]:
+        """Map md5 -> rendition file name (None: use the original) for size."""
+        return dict(
+            self._conn.execute("SELECT md5, filename FROM renditions WHERE size = ?", (size,))
+        )
+
+    def record_rendition(self, md5: str, size: str, filename: Optional[str]) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO renditions (md5, size, filename) VALUES (?, ?, ?)",
+            (md5, size, filename),
+        )
+
+    def forget_renditions(self, keep: set) -> None:
+        """Drop every rendition whose (md5, size) is not in keep."""
+        stale = [
+            row
+            for row in self._conn.execute("SELECT md5, size FROM renditions")
+            if row not in keep
+        ]
+        self._conn.executemany("DELETE FROM renditions WHERE md5 = ? AND size = ?", stale)
+
+    def video_probes(self) -> Dict[str, Optional[dict]]:
+        """Map md5 -> ffprobe description (None: unreadable) of probed videos."""
+        return {
+            md5: json.loads(probe) if probe else None
+            for md5, probe in self._conn.execute("SELECT md5, probe FROM video_probes")
+        }
+
+    def record_video_probe(self, md5: str, probe: Optional[dict]) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO video_probes (md5, probe) VALUES (?, ?)",
+            (md5, json.dumps(probe) if probe is not None else None),
+        )
+
+    def forget_video_probes(self, keep: set) -> None:
+        """Drop the probes of every md5 not in keep."""
+        stale = [
+            (md5,) for (md5,) in self._conn.execute("SELECT md5 FROM video_probes")
+            if md5 not in keep
+        ]
+        self._conn.executemany("DELETE FROM video_probes WHERE md5 = ?", stale)
+
+    def commit(self) -> None:
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class LocalPathAssigner:
+    """Give files that share a name in one Drive folder distinct local paths.
+
+    Each file may use its plain name or its disambiguated name. A file keeps
+    whichever of the two the manifest already records for it, so paths never
+    flip between runs; the rest take the plain name if it is free and the
+    disambiguated one otherwise. A path the manifest records for another
+    file counts as taken until that file has been placed or released.
+    """
+
+    def __init__(self, manifest: Dict[str, ManifestEntry]):
+        self._manifest = manifest
+        self._holders = {record.local_path: file_id for file_id, record in manifest.items()}
+        self._taken: set = set()
+        self._placed: set = set()
+
+    def _held_by_other(self, entry: DriveFile, batch_ids: set) -> bool:
+        holder = self._holders.get(entry.local_path)
+        return holder not in (None, entry.file_id) and holder not in self._placed | batch_ids
+
+    def release(self, file_ids: set) -> None:
+        """Free the manifest paths of files that are no longer in Drive."""
+        self._placed |= file_ids
+
+    def place(self, entries: List[DriveFile], defer: bool = False) -> List[DriveFile]:
+        """Set local_name on entries, in file-ID order.
+
+        Entries are expected to be synced together, so they may take each
+        other's old paths. With defer, an entry whose plain name is held by
+        a file outside entries is left out and returned instead, so a caller
+        streaming the listing can place it once the holder has been seen.
+        """
+        batch_ids = {entry.file_id for entry in entries}
+        unplaced: List[DriveFile] = []
+        for entry in sorted(entries, key=lambda e: e.file_id):
+            record = self._manifest.get(entry.file_id)
+            for local_name in ("", entry.disambiguated_name()):
+                entry.local_name = local_name
+                if record is not None and record.local_path == entry.local_path not in self._taken:
+                    self._taken.add(entry.local_path)
+                    break
+            else:
+                entry.local_name = ""
+                unplaced.append(entry)
+
+        waiting: List[DriveFile] = []
+        for entry in unplaced:
+            if defer and self._held_by_other(entry, batch_ids):
+                waiting.append(entry)
+                continue
+            if entry.local_path in self._taken or self._held_by_other(entry, batch_ids):
+                entry.local_name = entry.disambiguated_name()
+                logging.debug("Duplicate name in Drive folder; saving %s as %s", entry.name, entry.local_path)
+            self._taken.add(entry.local_path)
+        self._placed |= batch_ids - {entry.file_id for entry in waiting}
+        return waiting
+
+
+def _manifest_matches(record: Optional[ManifestEntry], entry: DriveFile) -> bool:
+    """Return True if the manifest says we already hold this remote version."""
+    if record is None:
+        return False
+    if record.md5_checksum and entry.md5_checksum:
+        return record.md5_checksum == entry.md5_checksum
+    if record.size is not None and entry.size is not None and record.size != entry.size:
+        return False
+    # Allow 1-second drift to avoid redundant downloads due to rounding.
+    return abs(record.remote_mtime - entry.modified_ts) <= 1
+
+
+def _local_md5(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.md5()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
 
 
 def _local_file_matches(
-    path: Path, entry: DriveFile, file_modified_times: dict[str, float]
+    media_dir: Path, local_path: str, entry: DriveFile, state: SyncState
 ) -> bool:
-    if not path.exists():
+    """Fallback for files on disk that the manifest does not know about yet.
+
+    A restored backup, media copied between cards or a FAT/exFAT drive's
+    2-second timestamps can leave the right content with the wrong mtime.
+    When only the mtime disagrees, the file's MD5 (cached in state, so it is
+    computed once per file) is compared with Drive's and, if it matches, the
+    mtime is corrected instead of downloading the file again.
+    """
+    path = media_dir / local_path
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
         return False
 
-    local_mtime = file_modified_times.get(path.name)
-    if local_mtime is None:
-        local_mtime = path.stat().st_mtime
-        file_modified_times[path.name] = local_mtime
-
-    remote_ts = entry.modified_time.timestamp()
     # Allow 1-second drift to avoid redundant downloads due to rounding.
-    if abs(local_mtime - remote_ts) > 1:
+    if abs(stat.st_mtime - entry.modified_ts) <= 1:
+        return True
+    if not entry.md5_checksum or entry.size is None or stat.st_size != entry.size:
         return False
 
+    md5 = state.local_md5(local_path, stat.st_size, stat.st_mtime)
+    if md5 is None:
+        try:
+            md5 = _local_md5(path)
+        except OSError as error:
+            logging.debug("Cannot hash %s: %s", local_path, error)
+            return False
+        state.record_local_md5(local_path, stat.st_size, stat.st_mtime, md5)
+    if md5 != entry.md5_checksum:
+        return False
+
+    try:
+        os.utime(path, (stat.st_atime, entry.modified_ts))
+        # The filesystem may round the new mtime; cache the hash against it.
+        state.record_local_md5(local_path, stat.st_size, path.stat().st_mtime, md5)
+    except OSError as error:
+        logging.debug("Cannot fix modification time of %s: %s", local_path, error)
+    logging.info("✓ Checksum matches, kept local copy: %s", local_path)
     return True
 
 
-def download_file(service, entry: DriveFile, destination: Path) -> None:
-    logging.info("Downloading %s", entry.name)
-    request = service.files().get_media(fileId=entry.file_id)
-    destination.parent.mkdir(parents=True, exist_ok=True)
+def _manifest_record(entry: DriveFile, media_dir: Path, local_path: str) -> ManifestEntry:
+    stat = (media_dir / local_path).stat()
+    return ManifestEntry(
+        file_id=entry.file_id,
+        name=entry.name,
+        local_path=local_path,
+        md5_checksum=entry.md5_checksum,
+        size=entry.size,
+        remote_mtime=entry.modified_ts,
+        local_inode=stat.st_ino,
+        local_mtime=stat.st_mtime,
+    )
+
+
+def _walk_local_tree(media_dir: Path, recursive: bool = True) -> Tuple[set, set]:
+    """Relative paths of the regular files and directories below media_dir.
+
+    Uses scandir's cached d_type, so this is one directory read per folder
+    rather than a stat() per file. The sync state directory is skipped.
+    """
+    files = set()
+    dirs = set()
+    stack = [""]
+    while stack:
+        prefix = stack.pop()
+        with os.scandir(media_dir / prefix if prefix else media_dir) as entries:
+            for item in entries:
+                relative = f"{prefix}/{item.name}" if prefix else item.name
+                if item.is_dir(follow_symlinks=False):
+                    if relative != STATE_DIRNAME:
+                        dirs.add(relative)
+                        if recursive:
+                            stack.append(relative)
+                elif item.is_file(follow_symlinks=False):
+                    files.add(relative)
+    return files, dirs
+
+
+def _list_local_names(media_dir: Path, recursive: bool = False) -> set:
+    return _walk_local_tree(media_dir, recursive)[0]
+
+
+def _prune_empty_dirs(media_dir: Path, keep: set) -> None:
+    """Remove local directories that no longer mirror a Drive folder."""
+    _, dirs = _walk_local_tree(media_dir)
+    # Deepest first so parents are empty by the time we reach them.
+    for relative in sorted(dirs - keep, key=lambda d: d.count("/"), reverse=True):
+        try:
+            (media_dir / relative).rmdir()
+            logging.info("✗ Removed folder (removed from Drive): %s", relative)
+        except OSError:
+            pass  # Not empty: something we don't manage lives there.
+
+
+class DownloadVerificationError(Exception):
+    """A finished download does not match what Drive says it should be."""
+
+
+class DownloadCancelled(Exception):
+    """The sync is stopping; the partial file is kept to resume next time."""
+
+
+def _partial_version(entry: DriveFile) -> dict:
+    """Remote version a partial download belongs to."""
+    return {
+        "file_id": entry.file_id,
+        "md5Checksum": entry.md5_checksum,
+        "modifiedTime": entry.modified_time.isoformat(),
+        "size": entry.size,
+    }
 
-    with io.FileIO(destination, "wb") as fh:
-        downloader = MediaIoBaseDownload(fh, request)
-        done = False
-        while not done:
-            _, done = downloader.next_chunk()
 
+def _resume_offset(part_path: Path, sidecar_path: Path, entry: DriveFile) -> int:
+    """Return how many bytes of part_path can be kept for this remote version."""
+    try:
+        recorded = json.loads(sidecar_path.read_text())
+        offset = part_path.stat().st_size
+    except (OSError, ValueError):
+        return 0
+    if recorded != _partial_version(entry):
+        return 0
+    if entry.size is not None and offset > entry.size:
+        return 0
+    return offset
+
+
+def _fetch_range(request, start: int, end: int) -> Tuple[object, bytes]:
+    """GET one byte range of a media request, as MediaIoBaseDownload does."""
+    headers = dict(getattr(request, "headers", {}) or {})
+    headers["range"] = f"bytes={start}-{end}"
+    resp, content = request.http.request(request.uri, "GET", headers=headers)
+    if resp.status not in (200, 206, 416):
+        raise HttpError(resp, content, uri=request.uri)
+    return resp, content
+
+
+def _content_total(resp) -> Optional[int]:
+    content_range = resp.get("content-range", "")
+    _, _, total = content_range.rpartition("/")
+    return int(total) if total.isdigit() else None
+
+
+def _fsync_dir(path: Path) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _publish(
+    part_path: Path, destination: Path, entry: DriveFile, md5: Optional[str] = None
+) -> None:
+    """Verify a finished download and atomically swap it into place.
+
+    md5 is the digest of part_path computed while it was written; it is
+    checked against Drive's md5Checksum when both are known. The player only
+    ever sees the old complete file or the new complete file; anything
+    already playing the old version keeps its open inode.
+    """
+    size = part_path.stat().st_size
+    if entry.size is not None and size != entry.size:
+        part_path.unlink()
+        raise DownloadVerificationError(
+            f"expected {entry.size} bytes, got {size}"
+        )
+    if md5 and entry.md5_checksum and md5 != entry.md5_checksum:
+        part_path.unlink()
+        raise DownloadVerificationError(
+            f"expected md5 {entry.md5_checksum}, got {md5}"
+        )
     # Preserve the server modified timestamp so we can skip re-download next time.
-    os.utime(destination, (time.time(), entry.modified_time.timestamp()))
+    os.utime(part_path, (time.time(), entry.modified_ts))
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(part_path, destination)
+    _fsync_dir(destination.parent)
+
+
+def _hash_part(part_path: Path, length: int, chunk_size: int) -> "hashlib._Hash":
+    """Start an MD5 over the first length bytes of a download being resumed."""
+    digest = hashlib.md5()
+    with open(part_path, "rb") as fh:
+        while length > 0:
+            block = fh.read(min(chunk_size, length))
+            if not block:
+                break
+            digest.update(block)
+            length -= len(block)
+    return digest
+
+
+def _fetch_to_part(
+    request,
+    part_path: Path,
+    offset: int,
+    total: Optional[int],
+    chunk_size: int,
+    should_stop: Callable[[], bool] = lambda: False,
+) -> str:
+    """Append the rest of the media to part_path and return the file's MD5.
+
+    The digest is updated from each chunk as it is written, so verifying a
+    download never reads the file back; only a resumed prefix is hashed
+    from disk.
+    """
+    digest = _hash_part(part_path, offset, chunk_size) if offset else hashlib.md5()
+    with open(part_path, "ab") as fh:
+        while total is None or offset < total:
+            if should_stop():
+                raise DownloadCancelled(part_path.name)
+            resp, content = drive_requests.call(
+                lambda: _fetch_range(request, offset, offset + chunk_size - 1)
+            )
+            if resp.status == 416:
+                # Nothing left to fetch: an empty file or an already complete part.
+                break
+            if resp.status == 200 and offset:
+                # Server ignored the Range header and sent the whole file.
+                fh.truncate(0)
+                offset = 0
+                digest = hashlib.md5()
+            fh.write(content)
+            digest.update(content)
+            fh.flush()
+            # Make the new offset durable before asking for the next range.
+            os.fsync(fh.fileno())
+            offset += len(content)
+            received = len(content)
+            del content  # Drop the chunk before fetching the next one.
+            total = _content_total(resp) if resp.status == 206 else offset
+            if total is None or not received:
+                break
+    return digest.hexdigest()
+
+
+def download_file(
+    service,
+    entry: DriveFile,
+    destination: Path,
+    partial_dir: Optional[Path] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE_MB * 1024 * 1024,
+    should_stop: Callable[[], bool] = lambda: False,
+) -> None:
+    """Download entry to destination, resuming an earlier partial transfer.
+
+    Data is streamed into partial_dir/<file_id>.part next to a JSON sidecar
+    recording the remote version. If a later run finds the same version it
+    continues with a Range request from the bytes already on disk; otherwise
+    the partial file is discarded. partial_dir must be on the same
+    filesystem as destination so the final rename is atomic.
+
+    Each ranged GET asks for at most chunk_size bytes, and each chunk is
+    written out before the next is requested, so memory use is bounded by
+    chunk_size regardless of the file size.
+
+    A download whose size or MD5 does not match Drive is discarded and
+    fetched again from scratch, up to DOWNLOAD_VERIFY_ATTEMPTS times in all,
+    before DownloadVerificationError is raised. If should_stop() turns true
+    between chunks, DownloadCancelled is raised and the partial file kept.
+    """
+    _import_google_clients()
+    if partial_dir is None:
+        partial_dir = destination.parent / STATE_DIRNAME / PARTIAL_DIRNAME
+    partial_dir.mkdir(parents=True, exist_ok=True)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    part_path = partial_dir / f"{entry.file_id}.part"
+    sidecar_path = partial_dir / f"{entry.file_id}.json"
+    request = service.files().get_media(fileId=entry.file_id)
+
+    for attempt in range(1, DOWNLOAD_VERIFY_ATTEMPTS + 1):
+        offset = _resume_offset(part_path, sidecar_path, entry)
+        if offset:
+            logging.info("Resuming %s from byte %d", entry.name, offset)
+        else:
+            logging.info("Downloading %s", entry.name)
+            part_path.unlink(missing_ok=True)
+            sidecar_path.write_text(json.dumps(_partial_version(entry)))
+
+        md5 = _fetch_to_part(request, part_path, offset, entry.size, chunk_size, should_stop)
+        try:
+            _publish(part_path, destination, entry, md5)
+        except DownloadVerificationError as error:
+            if attempt == DOWNLOAD_VERIFY_ATTEMPTS:
+                raise
+            logging.warning("Discarding corrupt download of %s (%s); retrying", entry.name, error)
+            continue
+        sidecar_path.unlink(missing_ok=True)
+        return
 
 
 def log_to_spreadsheet(
@@ -233,7 +1429,9 @@ def log_to_spreadsheet(
     errors: int = 0
 ) -> bool:
     """Log sync results to a Google Spreadsheet. Returns True if successful."""
-    if not gspread:
+    try:
+        import gspread
+    except ImportError:
         logging.warning("gspread library not installed. Install with: pip install gspread")
         return False
 
@@ -286,68 +1484,1220 @@ def log_to_spreadsheet(
         return False
 
 
-def sync_drive_folder(service, folder_id: str, media_dir: Path) -> tuple[List[Path], int, int, int]:
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _log_summary(
+    synced_paths: List[Path], downloaded_count: int, skipped_count: int, deleted_count: int
+) -> None:
+    logging.info("-" * 60)
+    logging.info("SYNC SUMMARY:")
+    logging.info("  Downloaded: %d files", downloaded_count)
+    logging.info("  Skipped (up-to-date): %d files", skipped_count)
+    logging.info("  Deleted: %d files", deleted_count)
+    logging.info("  Total synced: %d files", len(synced_paths))
+    logging.info("  Peak memory: %.1f MB", _peak_rss_mb())
     logging.info("=" * 60)
-    logging.info("SYNC STARTED - Drive folder %s -> %s", folder_id, media_dir)
-    media_dir.mkdir(parents=True, exist_ok=True)
-    file_metadata = {}
+
+
+def _delete_local_file(path: Path) -> bool:
     try:
-        remote_files = list_drive_files(service, folder_id)
-        logging.info("Found %d files in Drive folder (excluding subfolders)", len(remote_files))
-    except HttpError as error:
-        logging.error("Google Drive API error: %s", error)
-        return [], 0, 0, 0
+        path.unlink()
+    except FileNotFoundError:
+        return False
+    except OSError as error:
+        logging.error("✗ Failed to delete %s: %s", path.name, error)
+        return False
+    logging.info("✗ Deleted (removed from Drive): %s", path.name)
+    return True
+
+
+def _needs_download(
+    entry: DriveFile,
+    media_dir: Path,
+    state: SyncState,
+    manifest: Dict[str, ManifestEntry],
+    local_names: set,
+) -> bool:
+    local_path = entry.local_path
+    record = manifest.get(entry.file_id)
+    if record is not None:
+        up_to_date = record.local_path == local_path and local_path in local_names and _manifest_matches(record, entry)
+    else:
+        # Files from before the manifest existed: adopt them if they match.
+        up_to_date = local_path in local_names and _local_file_matches(media_dir, local_path, entry, state)
 
-    # Build set of remote file names (excluding folders)
-    remote_file_names = {
-        entry.name for entry in remote_files
-        if entry.mime_type != "application/vnd.google-apps.folder"
+    if not up_to_date:
+        return True
+    logging.debug("⊘ Skipped (up-to-date): %s", entry.name)
+    if record is None:
+        manifest[entry.file_id] = _manifest_record(entry, media_dir, local_path)
+        state.record_file(manifest[entry.file_id])
+    return False
+
+
+def _record_download(
+    entry: DriveFile,
+    media_dir: Path,
+    state: SyncState,
+    manifest: Dict[str, ManifestEntry],
+    local_names: set,
+) -> None:
+    local_names.add(entry.local_path)
+    manifest[entry.file_id] = _manifest_record(entry, media_dir, entry.local_path)
+    state.record_file(manifest[entry.file_id])
+
+
+def _reuse_local_copies(
+    pending: List[DriveFile],
+    media_dir: Path,
+    state: SyncState,
+    manifest: Dict[str, ManifestEntry],
+    local_names: set,
+    blob_names: Optional[set] = None,
+) -> Tuple[List[DriveFile], List[DriveFile]]:
+    """Satisfy pending downloads from content that is already on disk.
+
+    A file renamed in Drive keeps its file ID, and a copy keeps its
+    md5Checksum; either way we hardlink the existing local file (or its
+    blob, when the blob store is enabled) instead of fetching it again.
+    Every source is linked into staging before anything is published, so
+    swapped names cannot clobber each other. Returns the entries that were
+    reused and those that still need downloading.
+    """
+    partial_dir = media_dir / STATE_DIRNAME / PARTIAL_DIRNAME
+    partial_dir.mkdir(parents=True, exist_ok=True)
+    by_md5 = {
+        record.md5_checksum: record.local_path
+        for record in manifest.values()
+        if record.md5_checksum and record.local_path in local_names
     }
+    if blob_names:
+        by_md5.update(
+            (md5, f"{STATE_DIRNAME}/{BLOB_DIRNAME}/{md5}") for md5 in blob_names
+        )
 
-    synced_paths: List[Path] = []
-    downloaded_count = 0
-    skipped_count = 0
-    deleted_count = 0
+    staged: List[Tuple[DriveFile, str, Path]] = []
+    remaining: List[DriveFile] = []
+    for entry in pending:
+        record = manifest.get(entry.file_id)
+        if record is not None and record.local_path in local_names and _manifest_matches(record, entry):
+            source = record.local_path
+        else:
+            source = by_md5.get(entry.md5_checksum) if entry.md5_checksum else None
+        if source is None:
+            remaining.append(entry)
+            continue
+        staged_path = partial_dir / f"{entry.file_id}.part"
+        try:
+            staged_path.unlink(missing_ok=True)
+            os.link(media_dir / source, staged_path)
+        except OSError as error:
+            logging.debug("Cannot link %s, downloading instead: %s", source, error)
+            remaining.append(entry)
+            continue
+        staged.append((entry, source, staged_path))
+
+    reused: List[DriveFile] = []
+    for entry, source, staged_path in staged:
+        try:
+            _publish(staged_path, media_dir / entry.local_path, entry)
+        except (OSError, DownloadVerificationError) as error:
+            logging.debug("Cannot reuse %s, downloading instead: %s", source, error)
+            staged_path.unlink(missing_ok=True)
+            remaining.append(entry)
+            continue
+        logging.info("↻ Reused local copy: %s -> %s", source, entry.local_path)
+        _record_download(entry, media_dir, state, manifest, local_names)
+        reused.append(entry)
+    return reused, remaining
+
+
+class SeedDirectory:
+    """Existing media on local storage that pending downloads can come from.
+
+    The directory is walked once, on first use, and each file's MD5 is only
+    computed when a pending entry has the same size. A file matches an entry
+    by md5Checksum, or by size and name when Drive has no checksum.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._by_size: Optional[Dict[int, List[Path]]] = None
+        self._md5s: Dict[Path, str] = {}
+
+    def _scan(self) -> Dict[int, List[Path]]:
+        by_size: Dict[int, List[Path]] = {}
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [name for name in dirnames if not name.startswith(".")]
+            for name in filenames:
+                if name.startswith("."):
+                    continue
+                path = Path(dirpath) / name
+                try:
+                    by_size.setdefault(path.stat().st_size, []).append(path)
+                except OSError:
+                    continue
+        logging.info(
+            "Seed directory %s: %d files", self.root, sum(len(paths) for paths in by_size.values())
+        )
+        return by_size
 
-    for entry in remote_files:
-        if entry.mime_type == "application/vnd.google-apps.folder":
-            logging.debug("Skipping subfolder: %s", entry.name)
-            continue  # Skip nested folders for now.
+    def _md5(self, path: Path) -> Optional[str]:
+        if path not in self._md5s:
+            try:
+                self._md5s[path] = _local_md5(path)
+            except OSError as error:
+                logging.debug("Cannot hash seed file %s: %s", path, error)
+                return None
+        return self._md5s[path]
+
+    def find(self, entry: DriveFile) -> Optional[Tuple[Path, Optional[str]]]:
+        """Return (path, md5) of a local file with entry's content, or None."""
+        if entry.size is None:
+            return None
+        if self._by_size is None:
+            self._by_size = self._scan()
+        for path in self._by_size.get(entry.size, []):
+            if entry.md5_checksum:
+                if self._md5(path) == entry.md5_checksum:
+                    return path, entry.md5_checksum
+            elif path.name == entry.name:
+                return path, None
+        return None
+
+
+def _seed_pending(
+    pending: List[DriveFile],
+    seed: SeedDirectory,
+    media_dir: Path,
+    state: SyncState,
+    manifest: Dict[str, ManifestEntry],
+    local_names: set,
+) -> Tuple[List[DriveFile], List[DriveFile]]:
+    """Take pending entries from the seed directory instead of Drive.
+
+    Each match is hardlinked into staging, or copied when the seed lives on
+    another filesystem, then verified and published like a download.
+    Returns the entries that were seeded and those still to download.
+    """
+    partial_dir = media_dir / STATE_DIRNAME / PARTIAL_DIRNAME
+    partial_dir.mkdir(parents=True, exist_ok=True)
+    seeded: List[DriveFile] = []
+    remaining: List[DriveFile] = []
+    for entry in pending:
+        match = seed.find(entry)
+        if match is None:
+            remaining.append(entry)
+            continue
+        source, md5 = match
+        staged_path = partial_dir / f"{entry.file_id}.part"
+        try:
+            staged_path.unlink(missing_ok=True)
+            try:
+                os.link(source, staged_path)
+            except OSError:
+                shutil.copyfile(source, staged_path)
+            _publish(staged_path, media_dir / entry.local_path, entry, md5)
+        except (OSError, DownloadVerificationError) as error:
+            logging.debug("Cannot seed %s from %s, downloading instead: %s", entry.name, source, error)
+            staged_path.unlink(missing_ok=True)
+            remaining.append(entry)
+            continue
+        logging.info("↻ Seeded from %s: %s", source, entry.local_path)
+        _record_download(entry, media_dir, state, manifest, local_names)
+        seeded.append(entry)
+    return seeded, remaining
+
+
+def download_files(
+    service,
+    entries: List[DriveFile],
+    media_dir: Path,
+    workers: int = 1,
+    service_factory: Optional[Callable[[], object]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE_MB * 1024 * 1024,
+    should_stop: Callable[[], bool] = lambda: False,
+) -> Iterator[Tuple[DriveFile, Optional[Exception]]]:
+    """Download entries into media_dir, yielding (entry, error) as each finishes.
+
+    With more than one worker each thread gets its own service from
+    service_factory, because the underlying httplib2 connections are not
+    thread-safe. Without a factory downloads run one at a time.
+
+    Network errors (OSError) are reported like HttpErrors; the partial file
+    is kept so the next attempt resumes where this one stopped. Files that
+    fail verification are discarded and reported the same way. Once
+    should_stop() is true, unfinished entries are reported with
+    DownloadCancelled.
+    """
+    _import_google_clients()
+    partial_dir = media_dir / STATE_DIRNAME / PARTIAL_DIRNAME
+    errors = (HttpError, OSError, DownloadVerificationError, DownloadCancelled)
+    if workers <= 1 or service_factory is None or len(entries) <= 1:
+        for entry in entries:
+            try:
+                download_file(
+                    service, entry, media_dir / entry.local_path, partial_dir, chunk_size, should_stop
+                )
+            except errors as error:
+                yield entry, error
+            else:
+                yield entry, None
+        return
+
+    local = threading.local()
 
-        target_path = media_dir / entry.name
-        if not _local_file_matches(target_path, entry, file_metadata):
+    def _download(entry: DriveFile) -> None:
+        if not hasattr(local, "service"):
+            local.service = service_factory()
+        download_file(
+            local.service, entry, media_dir / entry.local_path, partial_dir, chunk_size, should_stop
+        )
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="download") as pool:
+        futures = {pool.submit(_download, entry): entry for entry in entries}
+        for future in as_completed(futures):
             try:
-                download_file(service, entry, target_path)
-                downloaded_count += 1
-                logging.info("✓ Downloaded: %s", entry.name)
-            except HttpError as error:
+                future.result()
+            except errors as error:
+                yield futures[future], error
+            else:
+                yield futures[future], None
+
+
+def _split_duplicate_content(
+    entries: List[DriveFile],
+) -> Tuple[List[DriveFile], List[DriveFile]]:
+    """Separate entries whose content another entry in the list already has."""
+    seen = set()
+    unique: List[DriveFile] = []
+    duplicates: List[DriveFile] = []
+    for entry in entries:
+        if entry.md5_checksum and entry.md5_checksum in seen:
+            duplicates.append(entry)
+            continue
+        if entry.md5_checksum:
+            seen.add(entry.md5_checksum)
+        unique.append(entry)
+    return unique, duplicates
+
+
+def _fetch_pending(
+    service,
+    pending: List[DriveFile],
+    media_dir: Path,
+    state: SyncState,
+    manifest: Dict[str, ManifestEntry],
+    local_names: set,
+    options: SyncOptions,
+    blob_names: Optional[set],
+) -> Tuple[List[DriveFile], List[DriveFile], List[DriveFile]]:
+    """Bring every pending entry up to date, fetching each content once.
+
+    Returns (downloaded, reused, failed) entries. Permanent failures are
+    recorded in state rather than returned as failed.
+    """
+    downloaded: List[DriveFile] = []
+    failed: List[DriveFile] = []
+
+    def fetch(entries: List[DriveFile]) -> None:
+        for entry, error in download_files(
+            service, entries, media_dir, options.workers, options.service_factory,
+            options.chunk_size, options.stop_requested,
+        ):
+            if isinstance(error, DownloadCancelled):
+                logging.debug("Stopped before %s finished; it resumes next time.", entry.name)
+                failed.append(entry)
+                continue
+            if error is not None and _is_permanent_failure(error):
+                # Remember it so later runs skip it until it changes in Drive.
+                logging.warning(
+                    "✗ Cannot download %s (skipping until it changes): %s", entry.name, error
+                )
+                state.record_failure(entry.file_id, entry.modified_ts, str(error))
+                continue
+            if error is not None:
                 logging.error("✗ Failed to download %s: %s", entry.name, error)
+                failed.append(entry)
                 continue
+            logging.info("✓ Downloaded: %s", entry.name)
+            state.clear_failure(entry.file_id)
+            _record_download(entry, media_dir, state, manifest, local_names)
+            downloaded.append(entry)
+
+    reused, pending = _reuse_local_copies(pending, media_dir, state, manifest, local_names, blob_names)
+    if options.seed is not None and pending:
+        seeded, pending = _seed_pending(pending, options.seed, media_dir, state, manifest, local_names)
+        reused.extend(seeded)
+    # Download one copy of each content, then link the duplicates to it.
+    unique, duplicates = _split_duplicate_content(pending)
+    fetch(unique)
+    if duplicates:
+        more_reused, pending = _reuse_local_copies(duplicates, media_dir, state, manifest, local_names)
+        reused.extend(more_reused)
+        fetch(pending)
+    return downloaded, reused, failed
+
+
+def _cleanup_partials(partial_dir: Path, remote_ids: set) -> None:
+    """Drop staged downloads of files that are no longer in Drive."""
+    if not partial_dir.is_dir():
+        return
+    for path in partial_dir.iterdir():
+        if path.stem not in remote_ids:
+            logging.debug("Removing stale partial download %s", path.name)
+            path.unlink(missing_ok=True)
+
+
+def _list_blob_names(media_dir: Path) -> Dict[str, int]:
+    """Map md5 -> inode for every blob, from a single directory read."""
+    blob_dir = media_dir / STATE_DIRNAME / BLOB_DIRNAME
+    blob_dir.mkdir(parents=True, exist_ok=True)
+    with os.scandir(blob_dir) as entries:
+        return {item.name: item.inode() for item in entries}
+
+
+def _update_blob_store(
+    media_dir: Path,
+    state: SyncState,
+    manifest: Dict[str, ManifestEntry],
+    local_names: set,
+    blobs: Dict[str, int],
+    gc_candidates: Optional[set] = None,
+) -> None:
+    """Make every visible file a hardlink of its content-addressed blob.
+
+    New content becomes a blob, separate copies of existing content are
+    relinked to the blob to free their space, and blobs no visible file
+    links to any more are removed. gc_candidates limits the garbage check
+    to those md5s; None checks every blob.
+    """
+    blob_dir = media_dir / STATE_DIRNAME / BLOB_DIRNAME
+    partial_dir = media_dir / STATE_DIRNAME / PARTIAL_DIRNAME
+    partial_dir.mkdir(parents=True, exist_ok=True)
+
+    for record in manifest.values():
+        md5 = record.md5_checksum
+        if not md5 or record.local_path not in local_names:
+            continue
+        visible = media_dir / record.local_path
+        blob_inode = blobs.get(md5)
+        try:
+            if blob_inode is None:
+                os.link(visible, blob_dir / md5)
+                blobs[md5] = record.local_inode
+            elif blob_inode != record.local_inode:
+                staged_path = partial_dir / f"{record.file_id}.part"
+                staged_path.unlink(missing_ok=True)
+                os.link(blob_dir / md5, staged_path)
+                os.replace(staged_path, visible)
+                logging.debug("Deduplicated %s", record.local_path)
+                record.local_inode = blob_inode
+                state.record_file(record)
+        except OSError as error:
+            logging.warning("Cannot link %s into the blob store: %s", record.local_path, error)
+
+    for md5 in list(blobs if gc_candidates is None else gc_candidates & blobs.keys()):
+        blob_path = blob_dir / md5
+        try:
+            if blob_path.stat().st_nlink <= 1:
+                blob_path.unlink()
+                del blobs[md5]
+                logging.debug("Removed unused blob %s", md5)
+        except OSError as error:
+            logging.warning("Cannot clean up blob %s: %s", md5, error)
+
+
+def _stream_remote_files(
+    service, folder_id: str, folders: Dict[str, str], options: SyncOptions
+) -> Iterator[List[DriveFile]]:
+    """Yield the remote listing for a full sync in batches as it arrives.
+
+    With a service_factory the listing runs ahead on its own thread and
+    service, so later pages are fetched while earlier ones download.
+    """
+    if not options.recursive:
+        folders[folder_id] = ""
+
+    def _pages() -> Iterator[List[DriveFile]]:
+        if options.recursive:
+            yield from iter_drive_tree(
+                service, folder_id, folders, options.workers, options.service_factory,
+                options.mime_types,
+            )
         else:
-            skipped_count += 1
-            logging.debug("⊘ Skipped (up-to-date): %s", entry.name)
+            lister = options.service_factory() if options.service_factory else service
+            yield from iter_drive_files(lister, folder_id, options.mime_types)
 
-        synced_paths.append(target_path)
+    return _read_ahead(_pages()) if options.service_factory else _pages()
 
-    # Delete local files that no longer exist on Google Drive
-    for local_file in media_dir.iterdir():
-        if local_file.is_file() and local_file.name not in remote_file_names:
+
+def _make_rendition(source: str, destination: str, width: int, height: int) -> bool:
+    """Write a JPEG of source that fits width x height to destination.
+
+    Runs in a worker process. Returns False without writing anything when
+    source already fits, so the original can be shown as it is.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(source) as image:
+        if image.width <= width and image.height <= height:
+            return False
+        # Lets the JPEG decoder skip most of a camera-sized image's pixels.
+        image.draft("RGB", (width, height))
+        rendition = ImageOps.exif_transpose(image)
+        rendition.thumbnail((width, height), Image.LANCZOS)
+        if rendition.mode != "RGB":
+            rendition = rendition.convert("RGB")
+        staged = f"{destination}.part"
+        rendition.save(staged, "JPEG", quality=90)
+    os.replace(staged, destination)
+    return True
+
+
+def _image_renditions(
+    media_dir: Path,
+    state: SyncState,
+    images: Dict[str, str],
+    size: Tuple[int, int],
+    workers: Optional[int] = None,
+) -> Tuple[str, Dict[str, str]]:
+    """Scale the images (local path -> md5) that have no rendition yet.
+
+    New renditions are made in a process pool, one process per core by
+    default. Returns the rendition directory name and the local path ->
+    rendition index entries for these images.
+    """
+    size_key = f"{size[0]}x{size[1]}"
+    rendition_dir = media_dir / STATE_DIRNAME / RENDITION_DIRNAME / size_key
+    rendition_dir.mkdir(parents=True, exist_ok=True)
+    known = state.renditions(size_key)
+    # One listing instead of a stat() per image on every cycle.
+    on_disk = set(os.listdir(rendition_dir))
+    sources: Dict[str, str] = {}
+    for local_path, md5 in images.items():
+        if md5 in known and (known[md5] is None or known[md5] in on_disk):
+            continue
+        sources.setdefault(md5, local_path)
+
+    if sources:
+        try:
+            import PIL  # noqa: F401
+        except ImportError:
+            logging.warning("Pillow is not installed (sudo apt-get install python3-pil); skipping image renditions.")
+            sources = {}
+    if sources:
+        # Imported here because it loads multiprocessing, which most runs never need.
+        from concurrent.futures import ProcessPoolExecutor
+
+        logging.info("Scaling %d images to %s", len(sources), size_key)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(
+                    _make_rendition,
+                    str(media_dir / local_path),
+                    str(rendition_dir / f"{md5}.jpg"),
+                    *size,
+                ): md5
+                for md5, local_path in sources.items()
+            }
+            for future in as_completed(futures):
+                md5 = futures[future]
+                try:
+                    made = future.result()
+                except Exception as error:  # Corrupt or unsupported image: show the original.
+                    logging.warning("Cannot scale %s: %s", sources[md5], error)
+                    made = False
+                known[md5] = f"{md5}.jpg" if made else None
+                state.record_rendition(md5, size_key, known[md5])
+
+    return size_key, {
+        local_path: f"{size_key}/{known[md5]}"
+        for local_path, md5 in images.items()
+        if known.get(md5)
+    }
+
+
+@dataclass(frozen=True)
+class VideoProfile:
+    """What the display's hardware H.264 decoder plays without dropping frames."""
+
+    width: int
+    height: int
+    max_fps: float = 30.0
+
+    @property
+    def key(self) -> str:
+        return f"h264-{self.width}x{self.height}-{self.max_fps:g}fps"
+
+
+def parse_video_profile(value: str) -> Optional[VideoProfile]:
+    """Parse "1920x1080" or "1920x1080@30"; an empty value disables transcoding."""
+    size, _, fps = value.strip().partition("@")
+    dimensions = parse_rendition_size(size)
+    if dimensions is None:
+        return None
+    try:
+        max_fps = float(fps) if fps else VideoProfile.max_fps
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT[@FPS], got {value!r}") from None
+    return VideoProfile(*dimensions, max_fps=max_fps)
+
+
+def _probe_video(path: Path) -> Optional[dict]:
+    """Return ffprobe's description of the first video stream, or None.
+
+    The container's duration in seconds is added as "duration" when known.
+    """
+    try:
+        result = subprocess.run(
+            [
+                "ffprobe", "-v", "error", "-select_streams", "v:0",
+                "-show_entries",
+                "stream=codec_name,profile,pix_fmt,width,height,avg_frame_rate:format=duration",
+                "-of", "json", str(path),
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            check=True,
+        )
+        probe = json.loads(result.stdout)
+    except (OSError, subprocess.CalledProcessError, ValueError) as error:
+        logging.warning("Cannot probe video %s: %s", path.name, error)
+        return None
+    streams = probe.get("streams") or []
+    if not streams:
+        return None
+    stream = dict(streams[0])
+    try:
+        stream["duration"] = float(probe["format"]["duration"])
+    except (KeyError, TypeError, ValueError):
+        pass
+    return stream
+
+
+def _probe_videos(
+    media_dir: Path, state: SyncState, videos: Dict[str, str]
+) -> Dict[str, Optional[dict]]:
+    """Return md5 -> _probe_video result for the videos (local path -> md5).
+
+    Results are kept in state, so each content is probed once, right after
+    its first download; None records a video ffprobe could not read. Without
+    ffprobe nothing new is probed.
+    """
+    probes = state.video_probes()
+    unprobed: Dict[str, str] = {}
+    for local_path, md5 in videos.items():
+        if md5 not in probes:
+            unprobed.setdefault(md5, local_path)
+    if unprobed and not shutil.which("ffprobe"):
+        logging.debug("ffprobe not installed; %d videos left unprobed.", len(unprobed))
+        return probes
+    if unprobed:
+        with ThreadPoolExecutor(max_workers=PROBE_WORKERS) as pool:
+            results = pool.map(_probe_video, (media_dir / path for path in unprobed.values()))
+            for md5, probe in zip(unprobed, results):
+                probes[md5] = probe
+                state.record_video_probe(md5, probe)
+    return probes
+
+
+def _frame_rate(stream: dict) -> float:
+    numerator, _, denominator = stream.get("avg_frame_rate", "0/1").partition("/")
+    try:
+        return float(numerator) / float(denominator or 1)
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+
+
+def _fits_profile(stream: dict, profile: VideoProfile) -> bool:
+    return (
+        stream.get("codec_name") == "h264"
+        and stream.get("profile") in H264_HARDWARE_PROFILES
+        and stream.get("pix_fmt") in ("yuv420p", "yuvj420p")
+        and stream.get("width", 0) <= profile.width
+        and stream.get("height", 0) <= profile.height
+        and _frame_rate(stream) <= profile.max_fps + 0.01
+    )
+
+
+def _transcode_command(source: Path, destination: Path, stream: dict, profile: VideoProfile) -> List[str]:
+    filters = [
+        f"scale=w='min({profile.width},iw)':h='min({profile.height},ih)'"
+        ":force_original_aspect_ratio=decrease:force_divisible_by=2"
+    ]
+    if _frame_rate(stream) > profile.max_fps + 0.01:
+        filters.append(f"fps={profile.max_fps:g}")
+    return [
+        "ffmpeg", "-nostdin", "-y", "-v", "error",
+        "-i", str(source),
+        "-map", "0:v:0", "-map", "0:a:0?",
+        "-vf", ",".join(filters),
+        "-c:v", "libx264", "-preset", "fast", "-crf", "20",
+        "-profile:v", "high", "-level:v", "4.1", "-pix_fmt", "yuv420p",
+        "-c:a", "aac", "-b:a", "160k",
+        "-movflags", "+faststart", "-f", "mp4",
+        str(destination),
+    ]
+
+
+class VideoTranscoder:
+    """Transcodes videos to a VideoProfile one at a time, in the background.
+
+    Jobs run on a single daemon thread as ffmpeg processes at idle CPU and
+    I/O priority, so playback and the sync itself are not slowed down. A
+    finished rendition appears atomically as <md5>.mp4; a failed one leaves
+    <md5>.failed so it is not retried until the content changes.
+    """
+
+    def __init__(self, profile: VideoProfile):
+        self.profile = profile
+        self._jobs: "queue.Queue[Tuple[Path, Path, dict]]" = queue.Queue()
+        self._queued: set = set()
+        self._lock = threading.Lock()
+        self._process: Optional[subprocess.Popen] = None
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, source: Path, destination: Path, stream: dict) -> None:
+        with self._lock:
+            if destination in self._queued or self._stopping:
+                return
+            self._queued.add(destination)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="transcode", daemon=True)
+                self._thread.start()
+        self._jobs.put((source, destination, stream))
+
+    def busy(self, destination: Path) -> bool:
+        with self._lock:
+            return destination in self._queued
+
+    def _run(self) -> None:
+        while True:
+            source, destination, stream = self._jobs.get()
             try:
-                local_file.unlink()
+                self._transcode(source, destination, stream)
+            finally:
+                with self._lock:
+                    self._queued.discard(destination)
+
+    def _transcode(self, source: Path, destination: Path, stream: dict) -> None:
+        if self._stopping:
+            return
+        staged = destination.with_name(f"{destination.name}.part")
+        command = ["nice", "-n", "19", *_transcode_command(source, staged, stream, self.profile)]
+        if shutil.which("ionice"):
+            command = ["ionice", "-c", "3", *command]
+        logging.info("Transcoding %s to %s", source.name, self.profile.key)
+        started = time.monotonic()
+        try:
+            self._process = subprocess.Popen(
+                command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+            )
+            _, stderr = self._process.communicate()
+            returncode = self._process.returncode
+        except OSError as error:
+            logging.warning("Cannot run ffmpeg for %s: %s", source.name, error)
+            return
+        finally:
+            self._process = None
+        if self._stopping:
+            staged.unlink(missing_ok=True)
+            return
+        if returncode != 0:
+            logging.warning(
+                "✗ Transcoding %s failed: %s", source.name, stderr.decode(errors="replace").strip()[-500:]
+            )
+            staged.unlink(missing_ok=True)
+            destination.with_suffix(".failed").touch()
+            return
+        try:
+            os.replace(staged, destination)
+        except OSError as error:  # The video was removed meanwhile.
+            logging.debug("Dropping transcode of %s: %s", source.name, error)
+            return
+        logging.info("✓ Transcoded %s in %.0fs", source.name, time.monotonic() - started)
+
+    def stop(self) -> None:
+        """Abandon queued jobs and kill the running ffmpeg."""
+        self._stopping = True
+        process = self._process
+        if process is not None:
+            process.terminate()
+
+
+def _video_renditions(
+    media_dir: Path,
+    state: SyncState,
+    videos: Dict[str, str],
+    transcoder: VideoTranscoder,
+) -> Tuple[str, Dict[str, str]]:
+    """Queue transcodes for the videos (local path -> md5) outside the profile.
+
+    Whether a video fits is decided once per content and profile, from its
+    cached probe, and kept in state. Returns the rendition directory name
+    and the local path -> rendition index entries, including renditions
+    still being made.
+    """
+    profile_key = transcoder.profile.key
+    rendition_dir = media_dir / STATE_DIRNAME / RENDITION_DIRNAME / profile_key
+    rendition_dir.mkdir(parents=True, exist_ok=True)
+    known = state.renditions(profile_key)
+    probes = _probe_videos(media_dir, state, videos)
+    # One listing instead of two stat() calls per video on every cycle; only a
+    # rendition missing from it is stat()ed, in case its job ended since.
+    on_disk = set(os.listdir(rendition_dir))
+    checked = set()
+    for local_path, md5 in videos.items():
+        if md5 in checked or md5 not in probes:
+            continue
+        checked.add(md5)
+        destination = rendition_dir / f"{md5}.mp4"
+        if f"{md5}.failed" in on_disk:
+            known[md5] = None
+            state.record_rendition(md5, profile_key, None)
+        if md5 in known and (
+            known[md5] is None
+            or destination.name in on_disk
+            or transcoder.busy(destination)
+            or destination.exists()
+            or destination.with_suffix(".failed").exists()
+        ):
+            continue
+        stream = probes[md5]
+        if stream is None or _fits_profile(stream, transcoder.profile):
+            known[md5] = None
+        else:
+            known[md5] = destination.name
+            transcoder.submit(media_dir / local_path, destination, stream)
+        state.record_rendition(md5, profile_key, known[md5])
+
+    return profile_key, {
+        local_path: f"{profile_key}/{known[md5]}"
+        for local_path, md5 in videos.items()
+        if known.get(md5)
+    }
+
+
+def _synced_videos(manifest: Dict[str, ManifestEntry], local_names: set) -> Dict[str, ManifestEntry]:
+    """Map local path -> manifest record of the synced videos with an md5."""
+    return {
+        record.local_path: record
+        for record in manifest.values()
+        if record.md5_checksum
+        and record.local_path in local_names
+        and Path(record.local_path).suffix.lower() in VIDEO_EXTENSIONS
+    }
+
+
+def _write_if_changed(path: Path, text: str) -> None:
+    """Atomically replace path with text, unless it already holds exactly that."""
+    try:
+        if path.read_text() == text:
+            return
+    except (OSError, UnicodeDecodeError):
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    staged = path.with_name(f"{path.name}.part")
+    staged.write_text(text)
+    os.replace(staged, path)
+
+
+def _update_renditions(
+    media_dir: Path,
+    state: SyncState,
+    manifest: Dict[str, ManifestEntry],
+    local_names: set,
+    options: SyncOptions,
+) -> Dict[str, str]:
+    """Refresh display-ready copies of synced images and videos.
+
+    Images larger than options.rendition_size are scaled down, and videos
+    outside the transcoder's profile are queued for transcoding; both are
+    keyed by md5 and target, so shared content is processed once. Writes the
+    local path -> rendition index the player reads and returns it, then
+    removes renditions nothing uses any more.
+    """
+    root = media_dir / STATE_DIRNAME / RENDITION_DIRNAME
+    images: Dict[str, str] = {}
+    for record in manifest.values():
+        if not record.md5_checksum or record.local_path not in local_names:
+            continue
+        if Path(record.local_path).suffix.lower() in RENDITION_EXTENSIONS:
+            images[record.local_path] = record.md5_checksum
+    videos = {path: record.md5_checksum for path, record in _synced_videos(manifest, local_names).items()}
+
+    index: Dict[str, str] = {}
+    kept: Dict[str, set] = {}
+    if options.rendition_size:
+        key, entries = _image_renditions(media_dir, state, images, options.rendition_size)
+        index.update(entries)
+        kept[key] = set(images.values())
+    if options.transcoder is not None:
+        key, entries = _video_renditions(media_dir, state, videos, options.transcoder)
+        index.update(entries)
+        kept[key] = set(videos.values())
+
+    _write_if_changed(root / RENDITION_INDEX_NAME, json.dumps(dict(sorted(index.items())), indent=0))
+
+    # Only now that the index no longer points at them.
+    state.forget_renditions({(md5, key) for key, md5s in kept.items() for md5 in md5s})
+    for path in root.iterdir():
+        if not path.is_dir():
+            continue
+        if path.name not in kept:
+            shutil.rmtree(path, ignore_errors=True)  # An old display size or profile.
+            continue
+        for item in path.iterdir():
+            # Names are <md5>.<ext>, plus .part while being written.
+            if item.name.split(".", 1)[0] not in kept[path.name]:
+                item.unlink(missing_ok=True)
+    return index
+
+
+def _update_media_info(
+    media_dir: Path,
+    state: SyncState,
+    manifest: Dict[str, ManifestEntry],
+    local_names: set,
+    renditions: Dict[str, str],
+) -> None:
+    """Write the duration, resolution and codec of every synced video.
+
+    The player reads this instead of running ffprobe, and sets each video's
+    playback timeout from its duration. Entries are keyed by path relative
+    to the media directory and carry the inode and size the file had when
+    it was synced, so the player can tell a stale entry from a valid one
+    without reading the file. The mtime is not used: copies hardlinked to
+    the same content share one inode, and so one mtime. Every download is
+    published as a new inode, so a replaced video never matches an old
+    entry. Transcoded renditions get an entry with the original's duration;
+    their names are content addressed, so they need no inode or size.
+    Videos are probed once per content (see _probe_videos).
+    """
+    videos = _synced_videos(manifest, local_names)
+    probes = _probe_videos(media_dir, state, {path: r.md5_checksum for path, r in videos.items()})
+    state.forget_video_probes({record.md5_checksum for record in videos.values()})
+
+    info: Dict[str, dict] = {}
+    for local_path, record in sorted(videos.items()):
+        probe = probes.get(record.md5_checksum)
+        if not probe or record.size is None or record.local_inode is None:
+            continue
+        info[local_path] = {
+            "size": record.size,
+            "inode": record.local_inode,
+            "duration": probe.get("duration"),
+            "width": probe.get("width"),
+            "height": probe.get("height"),
+            "codec": probe.get("codec_name"),
+        }
+        rendition = renditions.get(local_path)
+        if rendition:
+            rendition_path = f"{STATE_DIRNAME}/{RENDITION_DIRNAME}/{rendition}"
+            info[rendition_path] = {"duration": probe.get("duration"), "codec": "h264"}
+    _write_if_changed(media_dir / STATE_DIRNAME / MEDIA_INFO_NAME, json.dumps(info, indent=0))
+
+
+def _sync_full(
+    service,
+    folder_id: str,
+    media_dir: Path,
+    state: SyncState,
+    options: SyncOptions,
+) -> tuple[List[Path], int, int, int]:
+    start_page_token: Optional[str] = None
+    if options.incremental:
+        # Take the token before listing so changes made while we list are
+        # replayed on the next incremental run instead of being lost.
+        try:
+            start_page_token = get_start_page_token(service)
+        except HttpError as error:
+            logging.warning("Could not fetch Changes start page token: %s", error)
+
+    manifest = state.all_files()
+    previous_manifest = dict(manifest)
+    local_names = _list_local_names(media_dir, options.recursive)
+    blobs = _list_blob_names(media_dir) if options.dedupe else None
+    failures = state.failures()
+    paths = LocalPathAssigner(manifest)
+    folders: Dict[str, str] = {}
+    synced_paths: List[Path] = []
+    downloaded: List[DriveFile] = []
+    waiting: List[DriveFile] = []
+    remote_ids = set()
+    # Every listed file's local path, including ones that failed this run, so
+    # an old copy stays playable until a download actually replaces it.
+    listed_paths = set()
+    skipped_count = 0
+    deleted_count = 0
+
+    def sync_batch(entries: List[DriveFile]) -> None:
+        nonlocal skipped_count
+        pending: List[DriveFile] = []
+        for entry in entries:
+            listed_paths.add(entry.local_path)
+            if _is_known_failure(entry, failures):
+                continue
+            if _needs_download(entry, media_dir, state, manifest, local_names):
+                pending.append(entry)
+            else:
+                skipped_count += 1
+                synced_paths.append(media_dir / entry.local_path)
+
+        fetched, reused, _ = _fetch_pending(
+            service, pending, media_dir, state, manifest, local_names,
+            options, set(blobs) if blobs else None,
+        )
+        downloaded.extend(fetched)
+        skipped_count += len(reused)
+        synced_paths.extend(media_dir / entry.local_path for entry in fetched + reused)
+
+    # Downloads start with the first page; the listing carries on meanwhile.
+    try:
+        for batch in _stream_remote_files(service, folder_id, folders, options):
+            entries: List[DriveFile] = []
+            for entry in batch:
+                if entry.mime_type == FOLDER_MIME_TYPE:
+                    logging.debug("Skipping subfolder: %s", entry.name)
+                    continue  # Subfolders are only synced with --recursive.
+                remote_ids.add(entry.file_id)
+                entries.append(entry)
+            deferred = paths.place(entries, defer=True)
+            waiting.extend(deferred)
+            deferred_ids = {entry.file_id for entry in deferred}
+            sync_batch([entry for entry in entries if entry.file_id not in deferred_ids])
+            # Keep each batch's downloads even if the process is killed later.
+            state.commit()
+            if options.stop_requested():
+                # Like a listing error: nothing can be deleted without the full listing.
+                logging.info("Sync stopped before the listing finished; the rest waits for the next run.")
+                return synced_paths, len(downloaded), skipped_count, 0
+    except HttpError as error:
+        # Without the full listing we cannot tell what was deleted; keep what
+        # was downloaded and leave the rest to the next run.
+        logging.error("Google Drive API error: %s", error)
+        state.commit()
+        return synced_paths, len(downloaded), skipped_count, 0
+
+    if options.recursive:
+        logging.info(
+            "Found %d files in Drive folder and %d subfolders", len(remote_ids), len(folders) - 1
+        )
+    else:
+        logging.info("Found %d files in Drive folder (excluding subfolders)", len(remote_ids))
+
+    # Names the manifest held for files that are gone from Drive are free again.
+    paths.release(set(previous_manifest) - remote_ids)
+    paths.place(waiting)
+    sync_batch(waiting)
+
+    # Delete local files that no longer exist on Google Drive
+    kept_paths = {path.relative_to(media_dir).as_posix() for path in synced_paths}
+    kept_paths |= listed_paths
+    kept_paths |= {manifest[file_id].local_path for file_id in remote_ids if file_id in manifest}
+    for file_id, record in previous_manifest.items():
+        if file_id not in remote_ids:
+            state.forget_file(file_id)
+            del manifest[file_id]
+            if record.local_path not in kept_paths and _delete_local_file(media_dir / record.local_path):
                 deleted_count += 1
-                logging.info("✗ Deleted (removed from Drive): %s", local_file.name)
-            except OSError as error:
-                logging.error("✗ Failed to delete %s: %s", local_file.name, error)
+                local_names.discard(record.local_path)
+    # ...and anything else in the media directory that Drive doesn't have.
+    for name in local_names - kept_paths:
+        if _delete_local_file(media_dir / name):
+            deleted_count += 1
+            local_names.discard(name)
+    _cleanup_partials(media_dir / STATE_DIRNAME / PARTIAL_DIRNAME, remote_ids)
+    state.prune_failures(remote_ids)
+    state.prune_local_hashes(local_names)
+    if options.recursive:
+        _prune_empty_dirs(media_dir, set(folders.values()))
+    state.replace_folders(folders)
+    if blobs is not None:
+        _update_blob_store(media_dir, state, manifest, local_names, blobs)
+    renditions: Dict[str, str] = {}
+    if options.rendition_size or options.transcoder is not None:
+        renditions = _update_renditions(media_dir, state, manifest, local_names, options)
+    _update_media_info(media_dir, state, manifest, local_names, renditions)
+
+    if start_page_token:
+        state.page_token = start_page_token
+    state.commit()
+
+    _log_summary(synced_paths, len(downloaded), skipped_count, deleted_count)
+    return synced_paths, len(downloaded), skipped_count, deleted_count
+
+
+def _sync_incremental(
+    service,
+    folder_id: str,
+    media_dir: Path,
+    state: SyncState,
+    options: SyncOptions,
+) -> Optional[tuple[List[Path], int, int, int]]:
+    """Apply Changes feed deltas; return None if a full listing is needed."""
+    try:
+        changes, new_page_token = list_drive_changes(service, state.page_token)
+    except HttpError as error:
+        if _is_invalid_page_token(error):
+            logging.warning("Stored Changes page token rejected (%s); doing a full listing.", error)
+            state.page_token = None
+            state.commit()
+            return None
+        logging.error("Google Drive API error: %s", error)
+        return [], 0, 0, 0
 
-    logging.info("-" * 60)
-    logging.info("SYNC SUMMARY:")
-    logging.info("  Downloaded: %d files", downloaded_count)
-    logging.info("  Skipped (up-to-date): %d files", skipped_count)
-    logging.info("  Deleted: %d files", deleted_count)
-    logging.info("  Total synced: %d files", len(synced_paths))
+    # The feed may report the same file several times; only the latest
+    # change describes its current state.
+    latest: Dict[str, dict] = {}
+    for change in changes:
+        latest.pop(change["fileId"], None)
+        latest[change["fileId"]] = change
+    logging.info("Found %d changed files in Drive since last sync", len(latest))
+
+    folders = state.folders()
+    if options.recursive and any(
+        change.get("file", {}).get("mimeType") == FOLDER_MIME_TYPE
+        or change["fileId"] in folders
+        for change in latest.values()
+    ):
+        # Folders were added, moved, renamed or removed. Walking the tree
+        # again is simpler and safer than patching every affected path.
+        logging.info("Drive folder structure changed; doing a full listing.")
+        return None
+
+    manifest = state.all_files()
+    local_names = _list_local_names(media_dir, options.recursive)
+    blobs = _list_blob_names(media_dir) if options.dedupe else None
+    failures = state.failures()
+    changed: List[DriveFile] = []
+    pending: List[DriveFile] = []
+    previous: Dict[str, ManifestEntry] = {}
+    released_md5s = set()
+    skipped_count = 0
+    deleted_count = 0
+
+    def release(record: ManifestEntry) -> None:
+        nonlocal deleted_count
+        if record.md5_checksum:
+            released_md5s.add(record.md5_checksum)
+        in_use = any(other.local_path == record.local_path for other in manifest.values())
+        if not in_use and _delete_local_file(media_dir / record.local_path):
+            deleted_count += 1
+            local_names.discard(record.local_path)
+
+    for file_id, change in latest.items():
+        item = change.get("file") or {}
+        parent_id = next((p for p in item.get("parents", []) if p in folders), None)
+        in_folder = (
+            not change.get("removed")
+            and not item.get("trashed")
+            and parent_id is not None
+            # The Changes feed cannot be filtered server-side; apply the MIME filter here.
+            and (
+                item.get("mimeType") == FOLDER_MIME_TYPE
+                or _mime_allowed(item.get("mimeType", ""), options.mime_types)
+            )
+        )
+        record = manifest.get(file_id)
+
+        if not in_folder:
+            state.clear_failure(file_id)
+            if record is not None:
+                state.forget_file(file_id)
+                del manifest[file_id]
+                release(record)
+            continue
+
+        entry = _drive_file_from_item(item, folders[parent_id])
+        if entry.mime_type == FOLDER_MIME_TYPE:
+            logging.debug("Skipping subfolder: %s", entry.name)
+            continue
+        if not _is_known_failure(entry, failures):
+            changed.append(entry)
+
+    LocalPathAssigner(manifest).place(changed)
+    for entry in changed:
+        record = manifest.get(entry.file_id)
+        if _needs_download(entry, media_dir, state, manifest, local_names):
+            pending.append(entry)
+            if record is not None:
+                previous[entry.file_id] = record
+        else:
+            skipped_count += 1
+
+    downloaded, reused, failed = _fetch_pending(
+        service, pending, media_dir, state, manifest, local_names,
+        options, set(blobs) if blobs else None,
+    )
+    skipped_count += len(reused)
+    for entry in downloaded + reused:
+        record = previous.get(entry.file_id)
+        if record is not None and record.local_path != entry.local_path:
+            release(record)
+        elif record is not None and record.md5_checksum != entry.md5_checksum:
+            released_md5s.add(record.md5_checksum)
+    if blobs is not None:
+        _update_blob_store(media_dir, state, manifest, local_names, blobs, released_md5s)
+    renditions: Dict[str, str] = {}
+    if options.rendition_size or options.transcoder is not None:
+        renditions = _update_renditions(media_dir, state, manifest, local_names, options)
+    _update_media_info(media_dir, state, manifest, local_names, renditions)
+
+    # Leave the page token untouched on failures so those changes are retried.
+    if not failed:
+        state.page_token = new_page_token
+    state.commit()
+
+    synced_paths = [media_dir / path for path in sorted({r.local_path for r in manifest.values()})]
+    _log_summary(synced_paths, len(downloaded), skipped_count, deleted_count)
+    return synced_paths, len(downloaded), skipped_count, deleted_count
+
+
+def sync_drive_folder(
+    service,
+    folder_id: str,
+    media_dir: Path,
+    options: Optional[SyncOptions] = None,
+    state: Optional[SyncState] = None,
+) -> tuple[List[Path], int, int, int]:
+    """Sync folder_id into media_dir.
+
+    Pass an open state to reuse it across calls (daemon mode); otherwise the
+    sync state is opened and closed here.
+    """
+    options = options or SyncOptions()
     logging.info("=" * 60)
+    logging.info("SYNC STARTED - Drive folder %s -> %s", folder_id, media_dir)
+    media_dir.mkdir(parents=True, exist_ok=True)
 
-    return synced_paths, downloaded_count, skipped_count, deleted_count
+    _import_google_clients()
+    owns_state = state is None
+    if owns_state:
+        state = SyncState.for_media_dir(media_dir)
+    try:
+        state.bind_folder(folder_id, options.recursive)
+        if options.incremental and state.page_token:
+            result = _sync_incremental(service, folder_id, media_dir, state, options)
+            if result is not None:
+                return result
+        elif options.incremental:
+            logging.info("No stored Changes page token; doing a full listing.")
+        return _sync_full(service, folder_id, media_dir, state, options)
+    finally:
+        if owns_state:
+            state.close()
+
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "").strip().lower() in ("1", "true", "yes", "on")
 
 
 def parse_args() -> argparse.Namespace:
@@ -376,6 +2726,93 @@ def parse_args() -> argparse.Namespace:
         default=Path(os.environ.get("CREDENTIALS_PATH", DEFAULT_CREDENTIALS_PATH)),
         help="Path to the service-account credentials JSON file.",
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        default=_env_flag("SYNC_INCREMENTAL"),
+        help="Apply only Drive Changes since the last run instead of listing the whole folder.",
+    )
+    parser.add_argument(
+        "--download-workers",
+        type=int,
+        default=int(os.environ.get("DOWNLOAD_WORKERS", DEFAULT_DOWNLOAD_WORKERS)),
+        help="Number of files to download in parallel (default: 4).",
+    )
+    parser.add_argument(
+        "--chunk-size-mb",
+        type=int,
+        default=int(os.environ.get("DOWNLOAD_CHUNK_MB", DEFAULT_CHUNK_SIZE_MB)),
+        help="Megabytes fetched per download request; bounds memory per worker (default: 4).",
+    )
+    parser.add_argument(
+        "--max-requests-per-second",
+        type=float,
+        default=float(os.environ.get("DRIVE_MAX_RPS", DEFAULT_MAX_REQUESTS_PER_SECOND)),
+        help="Drive API requests per second shared by all workers; 0 disables (default: 10).",
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=int(os.environ.get("DRIVE_MAX_RETRIES", DEFAULT_MAX_RETRIES)),
+        help="Retries for rate-limited or failed Drive requests (default: 6).",
+    )
+    parser.add_argument(
+        "--mime-types",
+        type=parse_mime_types,
+        default=os.environ.get("SYNC_MIME_TYPES", DEFAULT_MIME_TYPES),
+        help=(
+            "Comma-separated MIME types to sync; a trailing '/' matches a family, "
+            "'*' syncs everything (default: image/,video/)."
+        ),
+    )
+    parser.add_argument(
+        "--recursive",
+        action="store_true",
+        default=_env_flag("SYNC_RECURSIVE"),
+        help="Also sync subfolders, mirroring the Drive folder tree locally.",
+    )
+    parser.add_argument(
+        "--dedupe",
+        action="store_true",
+        default=_env_flag("DEDUPE_MEDIA"),
+        help="Store each unique file once and hardlink it into the media directory.",
+    )
+    parser.add_argument(
+        "--rendition-size",
+        type=parse_rendition_size,
+        default=os.environ.get("RENDITION_SIZE", ""),
+        metavar="WIDTHxHEIGHT",
+        help="Also keep a copy of each larger image scaled to this display size "
+        "(e.g. 1920x1080), which the player shows instead of the original. Needs Pillow.",
+    )
+    parser.add_argument(
+        "--video-profile",
+        type=parse_video_profile,
+        default=os.environ.get("VIDEO_PROFILE", ""),
+        metavar="WIDTHxHEIGHT[@FPS]",
+        help="Transcode videos the display cannot decode in hardware to H.264 within "
+        "this size and frame rate (e.g. 1920x1080@30), in the background. Needs ffmpeg "
+        "and --daemon; one-shot runs only keep existing transcodes.",
+    )
+    parser.add_argument(
+        "--seed-from",
+        type=Path,
+        default=Path(os.environ["SYNC_SEED_DIR"]) if os.environ.get("SYNC_SEED_DIR") else None,
+        help="Take files from this local copy of the media (USB stick, another Pi's "
+        "media directory) when they match Drive, instead of downloading them.",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        default=_env_flag("SYNC_DAEMON"),
+        help="Keep running and sync every --interval seconds instead of exiting.",
+    )
+    parser.add_argument(
+        "--interval",
+        type=int,
+        default=int(os.environ.get("SYNC_INTERVAL_SECONDS", DEFAULT_SYNC_INTERVAL_SECONDS)),
+        help="Seconds between sync cycles in daemon mode (default: 300).",
+    )
     parser.add_argument(
         "--verbose",
         action="store_true",
@@ -402,40 +2839,47 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
-def validate_config(folder_id: str, credentials_path: Path) -> None:
+def validate_config(
+    folder_id: str, credentials_path: Path, seed_dir: Optional[Path] = None
+) -> None:
     if not folder_id or folder_id == DEFAULT_FOLDER_ID:
         raise SystemExit(
             "Drive folder ID is not set. Use --folder-id or set GDRIVE_FOLDER_ID."
         )
     if not credentials_path.exists():
         raise SystemExit(f"Credentials file not found: {credentials_path}")
+    if seed_dir is not None and not seed_dir.is_dir():
+        raise SystemExit(f"Seed directory not found: {seed_dir}")
 
 
-def main() -> None:
-    args = parse_args()
-    validate_config(args.folder_id, args.credentials)
-
-    # Clean up old entries from logs BEFORE setting up logging
+def cleanup_logs(args: argparse.Namespace) -> None:
     current_log = args.log_dir / "sync_current.log"
     history_log = args.log_dir / "sync_history.log"
     cleanup_log_file(current_log, args.log_retention_days, "current log")
     cleanup_log_file(history_log, args.history_retention_days, "history log")
 
-    # Now configure logging (appends to cleaned logs)
-    configure_logging(args.verbose, args.log_dir)
-
-    service = load_drive_service(args.credentials)
-    logging.info("Starting sync from Google Drive folder %s", args.folder_id)
 
-    synced_paths, downloaded, skipped, deleted = sync_drive_folder(
-        service, args.folder_id, args.media_dir
-    )
+def run_sync_cycle(
+    service,
+    creds,
+    args: argparse.Namespace,
+    options: SyncOptions,
+    state: Optional[SyncState] = None,
+) -> None:
+    started = time.monotonic()
+    try:
+        synced_paths, downloaded, skipped, deleted = sync_drive_folder(
+            service, args.folder_id, args.media_dir, options, state
+        )
+    finally:
+        # The token may have been refreshed during the sync.
+        save_cached_token(creds, args.media_dir / STATE_DIRNAME / TOKEN_CACHE_NAME)
     if synced_paths:
         logging.info("Successfully synced %d files to %s", len(synced_paths), args.media_dir)
     else:
         logging.warning("No files were synced.")
 
-    logging.info("Sync complete.")
+    logging.info("Sync complete in %.1fs.", time.monotonic() - started)
 
     # Log to Google Spreadsheet if configured
     if args.log_spreadsheet_id:
@@ -450,6 +2894,98 @@ def main() -> None:
         )
 
 
+def run_daemon(service, creds, args: argparse.Namespace, options: SyncOptions) -> None:
+    """Run sync cycles every args.interval seconds until SIGTERM/SIGINT.
+
+    The Drive services, their HTTP connections and the sync manifest stay
+    loaded between cycles. A signal stops the current cycle at the next
+    chunk or listing page, well within the unit's TimeoutStopSec: state is
+    committed after every batch, and interrupted downloads resume on the
+    next start.
+    """
+    stop_requested = threading.Event()
+    options.stop = stop_requested
+
+    def _handle_signal(signum, frame):
+        logging.info("Received signal %s, stopping the sync.", signum)
+        stop_requested.set()
+
+    signal.signal(signal.SIGINT, _handle_signal)
+    signal.signal(signal.SIGTERM, _handle_signal)
+
+    args.media_dir.mkdir(parents=True, exist_ok=True)
+    state = SyncState.for_media_dir(args.media_dir)
+    last_cleanup = time.monotonic()
+    try:
+        while not stop_requested.is_set():
+            try:
+                run_sync_cycle(service, creds, args, options, state)
+            except Exception as exc:
+                # Keep the daemon alive; the next cycle starts from the manifest.
+                logging.exception("Sync cycle failed: %s", exc)
+
+            if time.monotonic() - last_cleanup >= LOG_CLEANUP_INTERVAL_SECONDS:
+                cleanup_logs(args)
+                # The cleanup replaced the log files; reopen them.
+                configure_logging(args.verbose, args.log_dir)
+                last_cleanup = time.monotonic()
+
+            logging.info("Next sync in %d seconds.", args.interval)
+            stop_requested.wait(args.interval)
+    finally:
+        if options.transcoder is not None:
+            options.transcoder.stop()
+        state.close()
+    logging.info("Sync daemon stopped.")
+
+
+def main() -> None:
+    args = parse_args()
+    validate_config(args.folder_id, args.credentials, args.seed_from)
+
+    # Clean up old entries from logs BEFORE setting up logging
+    cleanup_logs(args)
+
+    # Now configure logging (appends to cleaned logs)
+    configure_logging(args.verbose, args.log_dir)
+
+    drive_requests.requests_per_second = args.max_requests_per_second
+    drive_requests.max_retries = args.max_retries
+    creds = load_drive_credentials(
+        args.credentials, args.media_dir / STATE_DIRNAME / TOKEN_CACHE_NAME
+    )
+    service = build_drive_service(creds)
+    transcoder = VideoTranscoder(args.video_profile) if args.video_profile else None
+    if transcoder is not None and not args.daemon:
+        # A transcode can take hours on a Pi; a one-shot run (the timer's
+        # oneshot unit) must not wait for it, and its processes die with it.
+        # Existing transcodes stay in use; the daemon queues missing ones.
+        logging.warning("--video-profile transcodes only with --daemon; no new jobs this run.")
+        transcoder.stop()
+    options = SyncOptions(
+        incremental=args.incremental,
+        recursive=args.recursive,
+        dedupe=args.dedupe,
+        workers=args.download_workers,
+        service_factory=make_service_factory(creds),
+        chunk_size=args.chunk_size_mb * 1024 * 1024,
+        mime_types=args.mime_types,
+        seed=SeedDirectory(args.seed_from) if args.seed_from else None,
+        rendition_size=args.rendition_size,
+        transcoder=transcoder,
+    )
+    logging.info(
+        "Startup took %.2fs (imports, credentials, Drive service).",
+        time.monotonic() - PROCESS_STARTED,
+    )
+    logging.info("Starting sync from Google Drive folder %s", args.folder_id)
+
+    if args.daemon:
+        run_daemon(service, creds, args, options)
+    else:
+        run_sync_cycle(service, creds, args, options)
+
+
 if __name__ == "__main__":
     try:
         main()
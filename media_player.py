@@ -7,21 +7,42 @@ making it ideal for digital signage or display purposes on a Raspberry Pi.
 """
 
 import argparse
+import bisect
+import ctypes
+import ctypes.util
+import errno
+import json
 import logging
 import os
+import select
 import signal
+import statistics
+import struct
 import subprocess
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional, Sequence
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Optional: only imported when the pygame renderer is selected.
+pygame = None
+
+# Used to report time to first frame after a (re)start.
+PROCESS_STARTED = time.monotonic()
 
 # --- Configuration ---------------------------------------------------------
 
 DEFAULT_MEDIA_DIR = Path(__file__).resolve().parent / "media"
 SLIDESHOW_DELAY = 8  # seconds
-DEFAULT_VIDEO_TIMEOUT = 300  # seconds if video duration probing fails
+DEFAULT_VIDEO_TIMEOUT = 300  # seconds if the sync has not recorded the duration
+VIDEO_TIMEOUT_MARGIN = 30  # seconds VLC gets beyond a video's duration
 
 IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp"}
+# Written by gdrive_sync.py --rendition-size/--video-profile: path -> display-ready copy.
+RENDITION_DIR = Path(".gdrive2video") / "renditions"
+RENDITION_INDEX = RENDITION_DIR / "index.json"
+# Written by gdrive_sync.py after each sync; see MediaInfo.
+MEDIA_INFO = Path(".gdrive2video") / "media_info.json"
 VIDEO_EXTENSIONS = {".mp4", ".mov", ".mkv", ".avi", ".webm"}
 
 FEH_BASE_CMD = [
@@ -40,6 +61,16 @@ FBI_BASE_CMD = [
     "--autozoom",
 ]
 
+# How often the pygame renderer checks for stop requests while an image is shown.
+RENDERER_POLL_SECONDS = 0.05
+# SDL video drivers whose window other programs' windows can cover. Any other
+# (kmsdrm, fbcon, ...) owns the screen, so the renderer closes it for videos.
+WINDOWED_VIDEO_DRIVERS = {"x11", "wayland"}
+# How long an empty media directory is waited on before logging again.
+EMPTY_WAIT_SECONDS = 30
+# Without inotify, the catalog rescans the media directory at most this often.
+CATALOG_POLL_SECONDS = 10
+
 VLC_BASE_CMD = [
     "cvlc",  # Command-line VLC
     "--fullscreen",
@@ -57,52 +88,366 @@ def configure_logging(verbose: bool) -> None:
     )
 
 
+def _walk_media_dir(media_dir: Path) -> List[str]:
+    """Return paths of all regular files below media_dir, skipping hidden folders.
+
+    Uses os.scandir so file types come from the directory listing instead of
+    a stat() per file, which matters once the sync mirrors a folder tree.
+    """
+    found: List[str] = []
+    stack = [str(media_dir)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not entry.name.startswith("."):
+                            stack.append(entry.path)
+                    elif entry.is_file():
+                        found.append(entry.path)
+        except OSError as exc:
+            logging.warning("Cannot read media folder: %s", exc)
+    return found
+
+
+def _load_renditions(media_dir: Path) -> Dict[str, Path]:
+    """Map media paths (relative to media_dir) to their display-ready copies.
+
+    Only renditions that are on disk are returned, checked with one
+    directory listing per rendition folder rather than a stat() per file;
+    a video still being transcoded plays from its original.
+    """
+    try:
+        index = json.loads((media_dir / RENDITION_INDEX).read_text())
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as exc:
+        logging.warning("Cannot read renditions index: %s", exc)
+        return {}
+
+    listed: Dict[str, set] = {}
+    renditions: Dict[str, Path] = {}
+    for original, rendition in index.items():
+        folder, _, name = rendition.partition("/")
+        if folder not in listed:
+            try:
+                listed[folder] = set(os.listdir(media_dir / RENDITION_DIR / folder))
+            except OSError:
+                listed[folder] = set()
+        if name in listed[folder]:
+            renditions[original] = media_dir / RENDITION_DIR / rendition
+    return renditions
+
+
 def categorize_media_files(media_dir: Path) -> tuple[List[Path], List[Path]]:
+    """Return the images and videos in media_dir, in path order.
+
+    Files the sync has made a rendition of (images scaled to the display
+    size, videos transcoded for the hardware decoder) are returned as that
+    rendition, so the player never decodes the original.
+    """
     image_files: List[Path] = []
     video_files: List[Path] = []
+    renditions = _load_renditions(media_dir)
 
-    for path in sorted(media_dir.glob("*")):
-        if not path.is_file():
-            continue
+    for path in map(Path, sorted(_walk_media_dir(media_dir))):
         suffix = path.suffix.lower()
         if suffix in IMAGE_EXTENSIONS:
-            image_files.append(path)
+            image_files.append(renditions.get(path.relative_to(media_dir).as_posix(), path))
         elif suffix in VIDEO_EXTENSIONS:
-            video_files.append(path)
+            video_files.append(renditions.get(path.relative_to(media_dir).as_posix(), path))
     return image_files, video_files
 
 
-def probe_video_duration(video_path: Path) -> Optional[float]:
-    """Return the video duration in seconds if ffprobe is available."""
-    try:
-        result = subprocess.run(
-            [
-                "ffprobe",
-                "-v",
-                "error",
-                "-of",
-                "default=noprint_wrappers=1:nokey=1",
-                "-show_entries",
-                "format=duration",
-                str(video_path),
-            ],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            check=True,
-        )
-    except FileNotFoundError:
-        logging.debug("ffprobe not installed; falling back to default timeout.")
-        return None
-    except subprocess.CalledProcessError as exc:
-        logging.warning("Failed to probe duration for %s: %s", video_path, exc)
-        return None
+# inotify(7) event bits, from <sys/inotify.h>.
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+INOTIFY_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len; then the name
 
-    try:
-        return float(result.stdout.strip())
-    except (TypeError, ValueError):
+
+class Inotify:
+    """Minimal inotify(7) binding through libc, so no extra package is needed.
+
+    Raises OSError when inotify is not available (not Linux, or no libc).
+    """
+
+    MASK = IN_CREATE | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE | IN_ONLYDIR
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        try:
+            self._add_watch = libc.inotify_add_watch
+            init = libc.inotify_init1
+        except AttributeError:
+            raise OSError(errno.ENOSYS, "inotify is not available") from None
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = init(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+
+    def add_watch(self, path: str) -> int:
+        wd = self._add_watch(self.fd, os.fsencode(path), self.MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error), path)
+        return wd
+
+    def wait(self, timeout: float) -> bool:
+        """Return whether events arrived within timeout seconds."""
+        return bool(select.select([self.fd], [], [], timeout)[0])
+
+    def read_events(self) -> List[Tuple[int, int, str]]:
+        """Return the queued (wd, mask, name) events without blocking."""
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+                offset += INOTIFY_EVENT.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+                offset += length
+                events.append((wd, mask, name))
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class MediaCatalog:
+    """The images and videos below media_dir, kept in memory between cycles.
+
+    inotify reports files as the sync adds and removes them, so listing the
+    media for a cycle costs nothing unless something changed, and follow()
+    picks up new files at the next item rather than the next cycle. Only
+    directories are watched; a new, removed or renamed folder triggers a
+    rescan. Without inotify (or when its watch limit is reached) the
+    directory is rescanned at most every CATALOG_POLL_SECONDS.
+    """
+
+    def __init__(self, media_dir: Path, use_inotify: bool = True):
+        self.media_dir = media_dir
+        self._root = str(media_dir)
+        self._inotify: Optional[Inotify] = None
+        if use_inotify:
+            try:
+                self._inotify = Inotify()
+            except OSError as exc:
+                logging.info("inotify unavailable (%s); polling the media directory.", exc)
+        self._watches: Dict[int, str] = {}
+        # Paths relative to media_dir, by kind, kept sorted for follow().
+        self._files: Dict[str, List[str]] = {"images": [], "videos": []}
+        self._renditions: Dict[str, Path] = {}
+        self._renditions_stale = False
+        self._scanned = 0.0
+        self._rescan()
+
+    @staticmethod
+    def _kind(name: str) -> Optional[str]:
+        suffix = os.path.splitext(name)[1].lower()
+        if suffix in IMAGE_EXTENSIONS:
+            return "images"
+        if suffix in VIDEO_EXTENSIONS:
+            return "videos"
         return None
 
+    @staticmethod
+    def _in_renditions(relative: str) -> bool:
+        renditions = RENDITION_DIR.as_posix()
+        return relative == renditions or relative.startswith(renditions + "/")
+
+    def _watch_hidden(self, relative: str) -> bool:
+        """Hidden folders are only watched on the way to the renditions."""
+        return self._inotify is not None and (
+            RENDITION_DIR.as_posix().startswith(relative + "/") or self._in_renditions(relative)
+        )
+
+    def _rescan(self) -> None:
+        """List media_dir from scratch and (re)watch every folder that matters."""
+        files: Dict[str, set] = {"images": set(), "videos": set()}
+        watches: Dict[int, str] = {}
+        stack = [""]
+        while stack:
+            relative = stack.pop()
+            path = os.path.join(self._root, relative) if relative else self._root
+            if self._inotify is not None:
+                try:
+                    watches[self._inotify.add_watch(path)] = relative
+                except OSError as exc:
+                    if exc.errno == errno.ENOSPC:
+                        logging.warning(
+                            "inotify watch limit reached (fs.inotify.max_user_watches); "
+                            "polling the media directory instead."
+                        )
+                        self._inotify.close()
+                        self._inotify = None
+                        watches = {}
+            hidden = relative.startswith(".") or "/." in relative
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        child = f"{relative}/{entry.name}" if relative else entry.name
+                        if entry.is_dir(follow_symlinks=False):
+                            if not entry.name.startswith("."):
+                                stack.append(child)
+                            elif self._watch_hidden(child):
+                                stack.append(child)
+                        elif not hidden and entry.is_file():
+                            kind = self._kind(entry.name)
+                            if kind:
+                                files[kind].add(child)
+            except OSError as exc:
+                if relative:
+                    logging.debug("Cannot read media folder %s: %s", relative, exc)
+                else:
+                    logging.warning("Cannot read media folder: %s", exc)
+        self._files = {kind: sorted(paths) for kind, paths in files.items()}
+        self._watches = watches
+        self._renditions = _load_renditions(self.media_dir)
+        self._renditions_stale = False
+        self._scanned = time.monotonic()
+
+    def refresh(self) -> None:
+        """Apply the changes made since the last call."""
+        if self._inotify is None:
+            if time.monotonic() - self._scanned >= CATALOG_POLL_SECONDS:
+                self._rescan()
+            return
+        rescan = False
+        for wd, mask, name in self._inotify.read_events():
+            if mask & IN_Q_OVERFLOW or mask & IN_ISDIR:
+                rescan = True
+                continue
+            relative = self._watches.get(wd)
+            if relative is None:
+                continue
+            if relative.startswith("."):
+                self._renditions_stale |= self._in_renditions(relative)
+                continue
+            kind = self._kind(name)
+            if kind is None or "/." in relative:
+                continue
+            path = f"{relative}/{name}" if relative else name
+            files = self._files[kind]
+            index = bisect.bisect_left(files, path)
+            present = index < len(files) and files[index] == path
+            if mask & (IN_CREATE | IN_CLOSE_WRITE | IN_MOVED_TO):
+                if not present:
+                    files.insert(index, path)
+            elif present:
+                del files[index]
+        if rescan:
+            self._rescan()
+        elif self._renditions_stale:
+            self._renditions = _load_renditions(self.media_dir)
+            self._renditions_stale = False
+
+    def _path(self, relative: str) -> Path:
+        # Display-ready copy made by the sync, if there is one.
+        return self._renditions.get(relative) or self.media_dir / relative
+
+    def follow(self, kind: str) -> Iterator[Path]:
+        """Yield the images or videos in path order, seeing changes as it goes.
+
+        Files added behind the current position wait for the next cycle;
+        removed ones are skipped.
+        """
+        position: Optional[str] = None
+        while True:
+            self.refresh()
+            keys = self._files[kind]
+            index = 0 if position is None else bisect.bisect_right(keys, position)
+            if index >= len(keys):
+                return
+            position = keys[index]
+            yield self._path(position)
+
+    def has_media(self) -> bool:
+        self.refresh()
+        return bool(self._files["images"] or self._files["videos"])
+
+    def wait_for_media(self, timeout: float) -> bool:
+        """Wait up to timeout seconds for any media; return whether there is some."""
+        deadline = time.monotonic() + timeout
+        while not (self._files["images"] or self._files["videos"]):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if self._inotify is not None:
+                self._inotify.wait(remaining)
+            else:
+                time.sleep(min(remaining, CATALOG_POLL_SECONDS))
+            self.refresh()
+        return True
+
+    def close(self) -> None:
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+
+class MediaInfo:
+    """Video durations recorded by the sync, so the player never runs ffprobe.
+
+    The file is re-read only when the sync has rewritten it, at the cost of
+    one stat() per cycle. An entry is trusted only while the video is still
+    the same inode, with the same size, as when it was probed.
+    """
+
+    def __init__(self, media_dir: Path):
+        self.media_dir = media_dir
+        self._entries: Dict[str, dict] = {}
+        self._loaded: Optional[int] = None
+
+    def refresh(self) -> None:
+        path = self.media_dir / MEDIA_INFO
+        try:
+            mtime = path.stat().st_mtime_ns
+        except OSError:
+            self._entries, self._loaded = {}, None
+            return
+        if mtime == self._loaded:
+            return
+        try:
+            self._entries = json.loads(path.read_text())
+        except (OSError, ValueError) as exc:
+            logging.warning("Cannot read media info: %s", exc)
+            self._entries = {}
+        self._loaded = mtime
+
+    def duration(self, video: Path) -> Optional[float]:
+        """Return the recorded duration of video in seconds, if still valid."""
+        try:
+            entry = self._entries.get(video.relative_to(self.media_dir).as_posix())
+        except ValueError:
+            return None
+        if not entry:
+            return None
+        if "size" in entry:
+            try:
+                stat = video.stat()
+            except OSError:
+                return None
+            if stat.st_size != entry["size"] or stat.st_ino != entry.get("inode"):
+                return None
+        return entry.get("duration")
+
+
+def video_timeout(video: Path, media_info: Optional[MediaInfo]) -> float:
+    duration = media_info.duration(video) if media_info is not None else None
+    if duration is None:
+        return DEFAULT_VIDEO_TIMEOUT
+    return duration + VIDEO_TIMEOUT_MARGIN
+
 
 def run_command(command: Sequence[str]) -> None:
     logging.debug("Executing command: %s", " ".join(command))
@@ -114,7 +459,155 @@ def run_command(command: Sequence[str]) -> None:
         logging.error("Command failed (%s): %s", exc.returncode, exc)
 
 
-def play_images(image_files: Sequence[Path], delay: int, use_framebuffer: bool = False) -> None:
+class PygameRenderer:
+    """Fullscreen image window owned by the player for its whole lifetime.
+
+    Unlike feh/fbi, nothing is spawned per cycle: the next image is decoded
+    and scaled on a worker thread while the current one is shown, so each
+    transition is a single blit and flip. Under X or Wayland the window
+    stays up between slideshows, so the last image covers the gap while a
+    video starts. Without a window system (kmsdrm, fbcon) the open display
+    keeps VLC off the screen, so it is released while videos play and
+    reopened for the next slideshow.
+    Set SDL_VIDEODRIVER (e.g. kmsdrm, dummy) to choose the display backend.
+    """
+
+    def __init__(self):
+        global pygame
+        os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+        import pygame
+
+        self._open_display()
+        self.driver = pygame.display.get_driver().lower()
+        self._released = False
+        self._decoder = ThreadPoolExecutor(max_workers=1, thread_name_prefix="image-decode")
+        # Decode of the next cycle's first image, started after the last one is shown.
+        self._preloaded: Optional[Tuple[Path, Future]] = None
+        # Seconds each swap happened after it was due; the first of a run includes its decode.
+        self.transition_latencies: List[float] = []
+
+    def _open_display(self) -> None:
+        pygame.display.init()
+        self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        pygame.mouse.set_visible(False)
+        self.size = self.screen.get_size()
+
+    def release(self) -> None:
+        """Hand the screen to another program (VLC) unless it has a window system."""
+        if self.driver in WINDOWED_VIDEO_DRIVERS or self._released:
+            return
+        logging.debug("Releasing the %s display.", self.driver)
+        pygame.display.quit()
+        self._released = True
+
+    def reopen(self) -> None:
+        """Take the screen back after release()."""
+        if not self._released:
+            return
+        self._open_display()
+        self._released = False
+
+    def _render(self, path: Path):
+        """Decode path and fit it to the screen, preserving its aspect ratio."""
+        try:
+            image = pygame.image.load(str(path))
+        except (pygame.error, OSError) as exc:
+            logging.warning("Cannot decode image %s: %s", path.name, exc)
+            return None
+        width, height = image.get_size()
+        scale = min(self.size[0] / width, self.size[1] / height)
+        fitted_size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        try:
+            fitted = pygame.transform.smoothscale(image, fitted_size)
+        except ValueError:
+            # smoothscale needs 24/32-bit pixels; palette images scale plainly.
+            fitted = pygame.transform.scale(image, fitted_size)
+        frame = pygame.Surface(self.size)
+        frame.blit(
+            fitted, ((self.size[0] - fitted_size[0]) // 2, (self.size[1] - fitted_size[1]) // 2)
+        )
+        return frame
+
+    def _decode(self, path: Path) -> Future:
+        if self._preloaded is not None and self._preloaded[0] == path:
+            future = self._preloaded[1]
+        else:
+            future = self._decoder.submit(self._render, path)
+        self._preloaded = None
+        return future
+
+    def _wait_until(self, deadline: float, should_stop: Callable[[], bool]) -> None:
+        while not should_stop():
+            pygame.event.pump()  # Keep the window responsive to the display server.
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, RENDERER_POLL_SECONDS))
+
+    def show(self, image_files: Iterable[Path], delay: int, should_stop: Callable[[], bool]) -> int:
+        """Show each image for delay seconds, returning early if should_stop().
+
+        image_files may be a live iterator (see MediaCatalog.follow); the
+        next image is taken from it as soon as the current one is on screen
+        and decoded while it is shown. Returns the number of images shown.
+        """
+        images = iter(image_files)
+        first = path = next(images, None)
+        if first is None:
+            return 0
+        shown_count = 0
+        next_frame = self._decode(first)
+        due = time.monotonic()
+        while path is not None:
+            frame = next_frame.result()
+            if frame is not None:
+                self._wait_until(due, should_stop)
+                if should_stop():
+                    return shown_count
+                self.screen.blit(frame, (0, 0))
+                pygame.display.flip()
+                shown = time.monotonic()
+                self.transition_latencies.append(shown - due)
+                logging.debug("Showing image: %s", path.name)
+                shown_count += 1
+                due = shown + delay
+            # Look ahead only now, so an image added while this one was due is next.
+            path = next(images, None)
+            # After the last image, start on the next cycle's first one.
+            next_frame = self._decode(path or first)
+        self._preloaded = (first, next_frame)
+        self._wait_until(due, should_stop)
+        return shown_count
+
+    def close(self) -> None:
+        self._decoder.shutdown(wait=True)
+        pygame.display.quit()
+
+
+def play_images(
+    image_files: Iterable[Path],
+    delay: int,
+    use_framebuffer: bool = False,
+    renderer: Optional[PygameRenderer] = None,
+    should_stop: Callable[[], bool] = lambda: False,
+) -> None:
+    if renderer is not None:
+        shown = len(renderer.transition_latencies)
+        if not renderer.show(image_files, delay, should_stop):
+            logging.info("No images found to display.")
+            return
+        latencies = renderer.transition_latencies[shown:]
+        logging.info("Showed image slideshow with %d images.", len(latencies))
+        if latencies:
+            logging.debug(
+                "Image transitions: median %.1f ms, max %.1f ms",
+                statistics.median(latencies) * 1000,
+                max(latencies) * 1000,
+            )
+        return
+
+    # feh and fbi take the whole slideshow up front.
+    image_files = list(image_files)
     if not image_files:
         logging.info("No images found to display.")
         return
@@ -141,27 +634,45 @@ def play_images(image_files: Sequence[Path], delay: int, use_framebuffer: bool =
     run_command(command)
 
 
-def play_videos(video_files: Sequence[Path]) -> None:
-    if not video_files:
+def play_videos(
+    video_files: Iterable[Path],
+    media_info: Optional[MediaInfo] = None,
+    renderer: Optional[PygameRenderer] = None,
+) -> None:
+    """Play each video with VLC; the renderer's display is released meanwhile."""
+    played = 0
+    try:
+        for video in video_files:
+            if renderer is not None and not played:
+                renderer.release()
+            played += 1
+            command = [*VLC_BASE_CMD, str(video)]
+            timeout = video_timeout(video, media_info)
+            logging.info("Playing video: %s", video.name)
+            try:
+                # VLC will play and exit automatically with --play-and-exit
+                subprocess.run(command, check=True, timeout=timeout)
+            except FileNotFoundError:
+                logging.error("VLC is not installed or not in PATH. Install with: sudo apt-get install vlc")
+                return
+            except subprocess.TimeoutExpired:
+                logging.warning("Video playback timed out for %s after %.0f seconds.", video.name, timeout)
+            except subprocess.CalledProcessError as exc:
+                logging.error("Video playback failed for %s: %s", video, exc)
+    finally:
+        if renderer is not None:
+            renderer.reopen()
+    if not played:
         logging.info("No videos found to play.")
-        return
 
-    for video in video_files:
-        command = [*VLC_BASE_CMD, str(video)]
-        logging.info("Playing video: %s", video.name)
-        try:
-            # VLC will play and exit automatically with --play-and-exit
-            subprocess.run(command, check=True, timeout=DEFAULT_VIDEO_TIMEOUT)
-        except FileNotFoundError:
-            logging.error("VLC is not installed or not in PATH. Install with: sudo apt-get install vlc")
-            return
-        except subprocess.TimeoutExpired:
-            logging.warning("Video playback timed out for %s after %s seconds.", video.name, DEFAULT_VIDEO_TIMEOUT)
-        except subprocess.CalledProcessError as exc:
-            logging.error("Video playback failed for %s: %s", video, exc)
 
-
-def playback_loop(media_dir: Path, delay: int, loop: bool = True, use_framebuffer: bool = False) -> None:
+def playback_loop(
+    media_dir: Path,
+    delay: int,
+    loop: bool = True,
+    use_framebuffer: bool = False,
+    renderer: Optional[PygameRenderer] = None,
+) -> None:
     """Main playback loop that cycles through images and videos."""
     stop_requested = False
 
@@ -173,27 +684,40 @@ def playback_loop(media_dir: Path, delay: int, loop: bool = True, use_framebuffe
     signal.signal(signal.SIGINT, _handle_signal)
     signal.signal(signal.SIGTERM, _handle_signal)
 
-    while True:
-        images, videos = categorize_media_files(media_dir)
-        if not images and not videos:
-            logging.warning("No media files available in %s", media_dir)
-            if not loop:
-                break
-            logging.info("Waiting 30 seconds before checking again...")
-            time.sleep(30)
+    catalog = MediaCatalog(media_dir)
+    media_info = MediaInfo(media_dir)
+    first_cycle = True
+    try:
+        while True:
+            media_info.refresh()
+            if not catalog.has_media():
+                logging.warning("No media files available in %s", media_dir)
+                if not loop:
+                    break
+                logging.info("Waiting up to %d seconds for media to arrive...", EMPTY_WAIT_SECONDS)
+                catalog.wait_for_media(EMPTY_WAIT_SECONDS)
+                if stop_requested:
+                    break
+                continue
+
+            if first_cycle:
+                logging.info(
+                    "Starting first media item %.2fs after launch.", time.monotonic() - PROCESS_STARTED
+                )
+                first_cycle = False
+
+            # Files the sync adds while a cycle plays join it at the next item.
+            play_images(catalog.follow("images"), delay, use_framebuffer, renderer, lambda: stop_requested)
             if stop_requested:
                 break
-            continue
 
-        play_images(images, delay, use_framebuffer)
-        if stop_requested:
-            break
-
-        play_videos(videos)
-        if stop_requested or not loop:
-            break
+            play_videos(catalog.follow("videos"), media_info, renderer)
+            if stop_requested or not loop:
+                break
 
-        logging.info("Completed one cycle. Starting over...")
+            logging.info("Completed one cycle. Starting over...")
+    finally:
+        catalog.close()
 
     logging.info("Playback stopped.")
 
@@ -224,6 +748,13 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Use framebuffer (fbi) for images instead of feh (for true headless operation).",
     )
+    parser.add_argument(
+        "--renderer",
+        choices=("viewer", "pygame"),
+        default=os.environ.get("IMAGE_RENDERER", "viewer"),
+        help="Show images by running feh/fbi each cycle (viewer) or in a persistent "
+        "pygame window that preloads the next image (pygame).",
+    )
     parser.add_argument(
         "--verbose",
         action="store_true",
@@ -245,9 +776,28 @@ def main() -> None:
     validate_config(args.media_dir)
 
     logging.info("Media player started. Playing files from: %s", args.media_dir)
-    if args.framebuffer:
+    renderer = None
+    if args.renderer == "pygame":
+        try:
+            renderer = PygameRenderer()
+            logging.info("Using pygame renderer for images (%dx%d)", *renderer.size)
+        except ImportError:
+            logging.warning("pygame is not installed (sudo apt-get install python3-pygame); using feh/fbi.")
+        except Exception as exc:  # pygame.error: no usable display
+            logging.warning("Cannot open pygame display (%s); using feh/fbi.", exc)
+    if renderer is None and args.framebuffer:
         logging.info("Using framebuffer mode (fbi) for images")
-    playback_loop(args.media_dir, args.slideshow_delay, loop=not args.once, use_framebuffer=args.framebuffer)
+    try:
+        playback_loop(
+            args.media_dir,
+            args.slideshow_delay,
+            loop=not args.once,
+            use_framebuffer=args.framebuffer,
+            renderer=renderer,
+        )
+    finally:
+        if renderer is not None:
+            renderer.close()
     logging.info("Media player exiting.")
 
 
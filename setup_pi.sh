@@ -3,6 +3,7 @@ set -euo pipefail
 
 SYNC_SERVICE="gdrive-sync.service"
 SYNC_TIMER="gdrive-sync.timer"
+SYNC_DAEMON_SERVICE="gdrive-sync-daemon.service"
 PLAYER_SERVICE="media-player.service"
 SERVICE_DEST="/etc/systemd/system"
 ENV_FILE="/etc/gdrive2video.env"
@@ -13,11 +14,12 @@ PROJECT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 
 usage() {
   cat <<EOF
-Usage: $0 [--folder-id DRIVE_FOLDER_ID] [--framebuffer]
+Usage: $0 [--folder-id DRIVE_FOLDER_ID] [--framebuffer] [--sync-daemon]
 
 Options:
   --folder-id    Google Drive folder ID to store in ${ENV_FILE}.
   --framebuffer  Use framebuffer (fbi) for images instead of feh (for true headless RPi2).
+  --sync-daemon  Run the sync as a long-lived daemon instead of a 5 minute timer.
   -h, --help     Show this help message.
 
 This script must be run on the Raspberry Pi that will play the media. It will:
@@ -30,6 +32,7 @@ EOF
 
 FOLDER_ID=""
 USE_FRAMEBUFFER="false"
+USE_SYNC_DAEMON="false"
 
 while [[ $# -gt 0 ]]; do
   case "$1" in
@@ -42,6 +45,10 @@ while [[ $# -gt 0 ]]; do
       USE_FRAMEBUFFER="true"
       shift
       ;;
+    --sync-daemon)
+      USE_SYNC_DAEMON="true"
+      shift
+      ;;
     -h|--help)
       usage
       exit 0
@@ -69,6 +76,8 @@ if [[ "${USE_FRAMEBUFFER}" == "true" ]]; then
     python3-pip \
     vlc \
     fbi \
+    python3-pygame \
+    python3-pil \
     ffmpeg
 else
   echo "  - Installing feh (requires X server)"
@@ -77,6 +86,8 @@ else
     python3-pip \
     vlc \
     feh \
+    python3-pygame \
+    python3-pil \
     ffmpeg
 fi
 
@@ -95,6 +106,7 @@ echo "Installing systemd services and timer..."
 # Copy and update service files with correct user
 sudo cp "${PROJECT_DIR}/${SYNC_SERVICE}" "${SERVICE_DEST}/${SYNC_SERVICE}"
 sudo cp "${PROJECT_DIR}/${SYNC_TIMER}" "${SERVICE_DEST}/${SYNC_TIMER}"
+sudo cp "${PROJECT_DIR}/${SYNC_DAEMON_SERVICE}" "${SERVICE_DEST}/${SYNC_DAEMON_SERVICE}"
 sudo cp "${PROJECT_DIR}/${PLAYER_SERVICE}" "${SERVICE_DEST}/${PLAYER_SERVICE}"
 
 # Update User, Group, and paths in service files
@@ -103,6 +115,11 @@ sudo sed -i "s/Group=pi/Group=${SERVICE_GROUP}/" "${SERVICE_DEST}/${SYNC_SERVICE
 sudo sed -i "s|WorkingDirectory=%h/gdrive2video|WorkingDirectory=${PROJECT_DIR}|" "${SERVICE_DEST}/${SYNC_SERVICE}"
 sudo sed -i "s|ExecStart=/usr/bin/python3 %h/gdrive2video/|ExecStart=/usr/bin/python3 ${PROJECT_DIR}/|" "${SERVICE_DEST}/${SYNC_SERVICE}"
 
+sudo sed -i "s/User=pi/User=${SERVICE_USER}/" "${SERVICE_DEST}/${SYNC_DAEMON_SERVICE}"
+sudo sed -i "s/Group=pi/Group=${SERVICE_GROUP}/" "${SERVICE_DEST}/${SYNC_DAEMON_SERVICE}"
+sudo sed -i "s|WorkingDirectory=%h/gdrive2video|WorkingDirectory=${PROJECT_DIR}|" "${SERVICE_DEST}/${SYNC_DAEMON_SERVICE}"
+sudo sed -i "s|ExecStart=/usr/bin/python3 %h/gdrive2video/|ExecStart=/usr/bin/python3 ${PROJECT_DIR}/|" "${SERVICE_DEST}/${SYNC_DAEMON_SERVICE}"
+
 sudo sed -i "s/User=pi/User=${SERVICE_USER}/" "${SERVICE_DEST}/${PLAYER_SERVICE}"
 sudo sed -i "s/Group=pi/Group=${SERVICE_GROUP}/" "${SERVICE_DEST}/${PLAYER_SERVICE}"
 sudo sed -i "s|WorkingDirectory=%h/gdrive2video|WorkingDirectory=${PROJECT_DIR}|" "${SERVICE_DEST}/${PLAYER_SERVICE}"
@@ -110,6 +127,7 @@ sudo sed -i "s|ExecStart=/usr/bin/python3 %h/gdrive2video/|ExecStart=/usr/bin/py
 
 sudo chmod 0644 "${SERVICE_DEST}/${SYNC_SERVICE}"
 sudo chmod 0644 "${SERVICE_DEST}/${SYNC_TIMER}"
+sudo chmod 0644 "${SERVICE_DEST}/${SYNC_DAEMON_SERVICE}"
 sudo chmod 0644 "${SERVICE_DEST}/${PLAYER_SERVICE}"
 
 if [[ -n "${FOLDER_ID}" ]]; then
@@ -153,20 +171,35 @@ fi
 
 echo "Reloading systemd and enabling services..."
 sudo systemctl daemon-reload
-sudo systemctl enable "${SYNC_TIMER}"
+if [[ "${USE_SYNC_DAEMON}" == "true" ]]; then
+  sudo systemctl disable --now "${SYNC_TIMER}" 2>/dev/null || true
+  SYNC_UNIT="${SYNC_DAEMON_SERVICE}"
+else
+  sudo systemctl disable --now "${SYNC_DAEMON_SERVICE}" 2>/dev/null || true
+  SYNC_UNIT="${SYNC_TIMER}"
+fi
+sudo systemctl enable "${SYNC_UNIT}"
 sudo systemctl enable "${PLAYER_SERVICE}"
-sudo systemctl start "${SYNC_TIMER}"
+sudo systemctl start "${SYNC_UNIT}"
 sudo systemctl start "${PLAYER_SERVICE}"
 
 echo ""
 echo "=== Setup Complete ==="
 echo ""
 echo "Check service status with:"
-echo "  sudo systemctl status ${SYNC_TIMER}"
+echo "  sudo systemctl status ${SYNC_UNIT}"
 echo "  sudo systemctl status ${PLAYER_SERVICE}"
 echo ""
 echo "View logs with:"
-echo "  journalctl -u ${SYNC_SERVICE} -f"
+if [[ "${USE_SYNC_DAEMON}" == "true" ]]; then
+  echo "  journalctl -u ${SYNC_DAEMON_SERVICE} -f"
+else
+  echo "  journalctl -u ${SYNC_SERVICE} -f"
+fi
 echo "  journalctl -u ${PLAYER_SERVICE} -f"
 echo ""
-echo "The sync will run every 5 minutes. First sync starting in 1 minute..."
+if [[ "${USE_SYNC_DAEMON}" == "true" ]]; then
+  echo "The sync daemon is running and will sync every 5 minutes (SYNC_INTERVAL_SECONDS)."
+else
+  echo "The sync will run every 5 minutes. First sync starting in 1 minute..."
+fi
@@ -0,0 +1,240 @@
+"""
+In-memory stand-in for the parts of the Drive v3 API gdrive_sync.py uses.
+
+Supports files().list (parent and mimeType queries, paging),
+files().get_media (ranged GETs) and the Changes feed (changes().getStartPageToken and
+changes().list). Every edit made through FakeDrive is recorded as a change,
+so incremental syncs see what a real Drive would report. Errors are raised
+as googleapiclient HttpErrors, so the google client libraries must be
+installed.
+"""
+
+import hashlib
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple, Union
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def http_error(status: int, reason: str = "") -> HttpError:
+    content = f'{{"error": {{"code": {status}, "errors": [{{"reason": "{reason}"}}]}}}}'
+    return HttpError(httplib2.Response({"status": status}), content.encode(), uri="fake://drive")
+
+
+class _Request:
+    def __init__(self, func):
+        self._func = func
+
+    def execute(self):
+        return self._func()
+
+
+class _MediaRequest:
+    """Serves byte ranges of a file the way an authorized http object does."""
+
+    headers: dict = {}
+
+    def __init__(self, drive: "FakeDrive", file_id: str):
+        self._drive = drive
+        self._file_id = file_id
+        self.uri = f"fake://media/{file_id}"
+        self.http = self
+
+    def request(self, uri, method, headers):
+        self._drive.download_attempts.append(self._file_id)
+        failure = self._drive.failing_downloads.get(self._file_id)
+        if failure is not None:
+            status, reason = failure if isinstance(failure, tuple) else (failure, "backendError")
+            raise http_error(status, reason)
+        content = self._drive.contents[self._file_id]
+        start, _, end = headers["range"][len("bytes="):].partition("-")
+        start, end = int(start), min(int(end), len(content) - 1)
+        if start >= len(content):
+            return httplib2.Response({"status": 416}), b""
+        self._drive.downloads.append(self._file_id)
+        self._drive.ranges.append((self._file_id, start))
+        response = httplib2.Response(
+            {"status": 206, "content-range": f"bytes {start}-{end}/{len(content)}"}
+        )
+        chunk = content[start:end + 1]
+        if self._drive.corrupt_downloads.get(self._file_id):
+            self._drive.corrupt_downloads[self._file_id] -= 1
+            chunk = bytes([chunk[0] ^ 0xFF]) + chunk[1:]
+        return response, chunk
+
+
+def _mime_matcher(q: str):
+    """Return a predicate for the mimeType clauses in q, or None if there are none."""
+    clauses = [
+        (operator, re.sub(r"\\(.)", r"\1", value))
+        for operator, value in re.findall(r"mimeType (contains|=) '((?:[^'\\]|\\.)*)'", q)
+    ]
+    if not clauses:
+        return None
+    return lambda mime_type: any(
+        value in mime_type if operator == "contains" else mime_type == value
+        for operator, value in clauses
+    )
+
+
+class _Files:
+    def __init__(self, drive: "FakeDrive"):
+        self._drive = drive
+
+    def list(self, q, pageSize, fields, pageToken=None, **kwargs):
+        def run():
+            self._drive.list_calls += 1
+            parents = set(re.findall(r"'([^']+)' in parents", q))
+            mime_matches = _mime_matcher(q)
+            items = [
+                item for item in self._drive.items.values()
+                if not item.get("trashed")
+                and parents & set(item["parents"])
+                and (mime_matches is None or mime_matches(item["mimeType"]))
+            ]
+            response = self._drive.page(items, pageToken, "files")
+            self._drive.listed.extend(item["id"] for item in response["files"])
+            return response
+
+        return _Request(run)
+
+    def get_media(self, fileId):
+        return _MediaRequest(self._drive, fileId)
+
+
+class _Changes:
+    def __init__(self, drive: "FakeDrive"):
+        self._drive = drive
+
+    def getStartPageToken(self, **kwargs):
+        return _Request(lambda: {"startPageToken": self._drive.token()})
+
+    def list(self, pageToken, pageSize=1000, **kwargs):
+        def run():
+            self._drive.changes_calls += 1
+            if self._drive.changes_error is not None:
+                raise http_error(self._drive.changes_error)
+            epoch, _, position = pageToken.partition(":")
+            if epoch != str(self._drive.token_epoch) or not position.isdigit():
+                raise http_error(400, "invalidPageToken")
+            start = int(position)
+            changes = self._drive.log[start:start + min(pageSize, self._drive.page_size)]
+            response = {"changes": changes}
+            if start + len(changes) < len(self._drive.log):
+                response["nextPageToken"] = f"{epoch}:{start + len(changes)}"
+            else:
+                response["newStartPageToken"] = self._drive.token()
+            return response
+
+        return _Request(run)
+
+
+class FakeDrive:
+    """A Drive holding one folder tree below root_id, plus its change log."""
+
+    def __init__(self, root_id: str = "root", page_size: int = 1000):
+        self.root_id = root_id
+        self.page_size = page_size
+        self.items: Dict[str, dict] = {}
+        self.contents: Dict[str, bytes] = {}
+        self.log: List[dict] = []
+        # Bumped by expire_tokens(); tokens from an older epoch are rejected.
+        self.token_epoch = 0
+        # file ID -> HTTP status, or (status, reason), every download of that
+        # file fails with; the reason defaults to backendError.
+        self.failing_downloads: Dict[str, Union[int, Tuple[int, str]]] = {}
+        # file ID -> how many of its next ranged GETs return a flipped first byte.
+        self.corrupt_downloads: Dict[str, int] = {}
+        # HTTP status changes().list fails with, if set.
+        self.changes_error: Optional[int] = None
+        # File ID of every successful ranged GET, and of every attempted one.
+        self.downloads: List[str] = []
+        self.download_attempts: List[str] = []
+        # (file ID, first byte) of every successful ranged GET.
+        self.ranges: List[Tuple[str, int]] = []
+        # File ID of every item files().list returned.
+        self.listed: List[str] = []
+        self.list_calls = 0
+        self.changes_calls = 0
+        self._next_id = 0
+        self._clock = 0
+
+    # --- the service interface -------------------------------------------
+
+    def files(self) -> _Files:
+        return _Files(self)
+
+    def changes(self) -> _Changes:
+        return _Changes(self)
+
+    def token(self) -> str:
+        return f"{self.token_epoch}:{len(self.log)}"
+
+    def page(self, items: List[dict], page_token: Optional[str], key: str) -> dict:
+        start = int(page_token or 0)
+        response = {key: [dict(item) for item in items[start:start + self.page_size]]}
+        if start + self.page_size < len(items):
+            response["nextPageToken"] = str(start + self.page_size)
+        return response
+
+    # --- editing the Drive ------------------------------------------------
+
+    def _modified_time(self) -> str:
+        self._clock += 1
+        return (_EPOCH + timedelta(minutes=self._clock)).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+    def _record(self, file_id: str, removed: bool = False) -> None:
+        change = {"fileId": file_id, "removed": removed}
+        if not removed:
+            change["file"] = dict(self.items[file_id])
+        self.log.append(change)
+
+    def add(
+        self, name: str, content: bytes = b"", parent: Optional[str] = None, mime_type: str = "video/mp4"
+    ) -> str:
+        self._next_id += 1
+        file_id = f"file{self._next_id:04d}"
+        item = {
+            "id": file_id,
+            "name": name,
+            "mimeType": mime_type,
+            "modifiedTime": self._modified_time(),
+            "parents": [parent or self.root_id],
+        }
+        if mime_type != FOLDER_MIME_TYPE:
+            item["md5Checksum"] = hashlib.md5(content).hexdigest()
+            item["size"] = str(len(content))
+            self.contents[file_id] = content
+        self.items[file_id] = item
+        self._record(file_id)
+        return file_id
+
+    def update(self, file_id: str, content: Optional[bytes] = None, name: Optional[str] = None) -> None:
+        item = self.items[file_id]
+        if content is not None:
+            item["md5Checksum"] = hashlib.md5(content).hexdigest()
+            item["size"] = str(len(content))
+            self.contents[file_id] = content
+        if name is not None:
+            item["name"] = name
+        item["modifiedTime"] = self._modified_time()
+        self._record(file_id)
+
+    def trash(self, file_id: str) -> None:
+        self.items[file_id]["trashed"] = True
+        self._record(file_id)
+
+    def remove(self, file_id: str) -> None:
+        """Delete the file for good; the feed reports only removed=True."""
+        del self.items[file_id]
+        self.contents.pop(file_id, None)
+        self._record(file_id, removed=True)
+
+    def expire_tokens(self) -> None:
+        """Make every page token handed out so far invalid."""
+        self.token_epoch += 1
@@ -0,0 +1,118 @@
+"""
+Downloads (download_file, download_files) against the in-memory FakeDrive.
+
+Run from the repository root with: python -m unittest discover tests
+"""
+
+import hashlib
+import logging
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import gdrive_sync
+
+try:
+    from tests.fake_drive import FakeDrive
+except ImportError:  # The google client libraries are not installed.
+    FakeDrive = None
+
+
+CHUNK_SIZE = 4
+
+
+@unittest.skipIf(FakeDrive is None, "needs google-api-python-client")
+class DownloadTest(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.media_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.media_dir)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        scheduler = gdrive_sync.drive_requests
+        self.addCleanup(
+            setattr, scheduler, "requests_per_second", scheduler.requests_per_second
+        )
+        self.addCleanup(setattr, scheduler, "max_retries", scheduler.max_retries)
+        scheduler.requests_per_second = 0
+        scheduler.max_retries = 0
+        self.drive = FakeDrive()
+        self.partial_dir = self.media_dir / gdrive_sync.STATE_DIRNAME / gdrive_sync.PARTIAL_DIRNAME
+
+    def entry(self, file_id: str) -> gdrive_sync.DriveFile:
+        return gdrive_sync._drive_file_from_item(self.drive.items[file_id])
+
+    def download(self, file_id: str, **kwargs) -> Path:
+        destination = self.media_dir / self.drive.items[file_id]["name"]
+        gdrive_sync.download_file(
+            self.drive, self.entry(file_id), destination, self.partial_dir, CHUNK_SIZE, **kwargs
+        )
+        return destination
+
+    def test_errors_are_reported_before_the_google_clients_are_loaded(self):
+        failing = self.drive.add("a.mp4", b"aaa")
+        self.drive.failing_downloads[failing] = 404
+        unloaded = dict(httplib2=None, service_account=None, build=None, HttpError=None)
+        with mock.patch.multiple(gdrive_sync, **unloaded):
+            results = list(gdrive_sync.download_files(self.drive, [self.entry(failing)], self.media_dir))
+            self.assertTrue(gdrive_sync._is_permanent_failure(results[0][1]))
+        [(entry, error)] = results
+        self.assertEqual(entry.file_id, failing)
+        self.assertEqual(error.resp.status, 404)
+
+    def test_cancelled_download_resumes_from_the_saved_offset(self):
+        content = b"0123456789abcdefghij"
+        file_id = self.drive.add("clip.mp4", content)
+        with self.assertRaises(gdrive_sync.DownloadCancelled):  # Stop before the third chunk.
+            self.download(file_id, should_stop=iter([False, False, True]).__next__)
+        part_path = self.partial_dir / f"{file_id}.part"
+        self.assertEqual(part_path.read_bytes(), content[:2 * CHUNK_SIZE])
+        self.assertTrue((self.partial_dir / f"{file_id}.json").exists())
+        self.assertFalse((self.media_dir / "clip.mp4").exists())
+
+        self.drive.ranges.clear()
+        destination = self.download(file_id)
+
+        self.assertEqual(self.drive.ranges[0], (file_id, 2 * CHUNK_SIZE))
+        self.assertEqual(hashlib.md5(destination.read_bytes()).hexdigest(), self.entry(file_id).md5_checksum)
+        self.assertEqual(list(self.partial_dir.iterdir()), [])
+
+    def test_changed_file_is_not_resumed(self):
+        file_id = self.drive.add("clip.mp4", b"0123456789")
+        with self.assertRaises(gdrive_sync.DownloadCancelled):
+            self.download(file_id, should_stop=iter([False, True]).__next__)
+        self.drive.update(file_id, content=b"abcdefghij")
+
+        self.drive.ranges.clear()
+        destination = self.download(file_id)
+
+        self.assertEqual(self.drive.ranges[0], (file_id, 0))
+        self.assertEqual(destination.read_bytes(), b"abcdefghij")
+
+    def test_corrupt_download_is_fetched_again(self):
+        file_id = self.drive.add("clip.mp4", b"0123456789")
+        self.drive.corrupt_downloads[file_id] = 1
+        destination = self.download(file_id)
+        self.assertEqual(destination.read_bytes(), b"0123456789")
+        # The first pass is discarded and the second starts from scratch.
+        self.assertEqual([start for _, start in self.drive.ranges], [0, 4, 8, 0, 4, 8])
+
+    def test_corrupt_download_keeps_the_old_copy(self):
+        file_id = self.drive.add("clip.mp4", b"old")
+        destination = self.download(file_id)
+        self.drive.update(file_id, content=b"0123456789")
+        self.drive.corrupt_downloads[file_id] = 100  # Every attempt this call makes.
+
+        with self.assertRaises(gdrive_sync.DownloadVerificationError):
+            self.download(file_id)
+        self.assertEqual(destination.read_bytes(), b"old")
+        self.assertFalse((self.partial_dir / f"{file_id}.part").exists())
+
+        self.drive.corrupt_downloads.clear()
+        self.download(file_id)
+        self.assertEqual(destination.read_bytes(), b"0123456789")
+
+
+if __name__ == "__main__":
+    unittest.main()
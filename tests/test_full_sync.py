@@ -0,0 +1,91 @@
+"""
+Full (listing) syncs against the in-memory FakeDrive.
+
+Run from the repository root with: python -m unittest discover tests
+"""
+
+import logging
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import gdrive_sync
+
+try:
+    from tests.fake_drive import FakeDrive
+except ImportError:  # The google client libraries are not installed.
+    FakeDrive = None
+
+GOOGLE_DOC = "application/vnd.google-apps.document"
+
+
+@unittest.skipIf(FakeDrive is None, "needs google-api-python-client")
+class FullSyncTest(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.media_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.media_dir)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        scheduler = gdrive_sync.drive_requests
+        self.addCleanup(
+            setattr, scheduler, "requests_per_second", scheduler.requests_per_second
+        )
+        self.addCleanup(setattr, scheduler, "max_retries", scheduler.max_retries)
+        scheduler.requests_per_second = 0
+        scheduler.max_retries = 0
+        self.drive = FakeDrive()
+        self.options = gdrive_sync.SyncOptions()
+
+    def sync(self):
+        return gdrive_sync.sync_drive_folder(self.drive, "root", self.media_dir, self.options)
+
+    def local_files(self):
+        return sorted(path.name for path in self.media_dir.iterdir() if path.is_file())
+
+    def test_mime_filter_is_applied_by_drive(self):
+        self.drive.add("clip.mp4", b"video")
+        self.drive.add("photo.jpg", b"image", mime_type="image/jpeg")
+        doc = self.drive.add("notes", mime_type=GOOGLE_DOC)
+        self.sync()
+        self.assertNotIn(doc, self.drive.listed)
+        self.assertEqual(self.local_files(), ["clip.mp4", "photo.jpg"])
+
+    def test_permanent_failure_is_skipped_until_the_file_changes(self):
+        blocked = self.drive.add("blocked.mp4", b"aaa")
+        self.drive.failing_downloads[blocked] = (403, "fileNotDownloadable")
+        self.sync()
+        self.assertEqual(self.drive.download_attempts, [blocked])
+
+        self.sync()
+        self.assertEqual(self.drive.download_attempts, [blocked])
+
+        self.drive.update(blocked, content=b"fixed")
+        del self.drive.failing_downloads[blocked]
+        self.sync()
+        self.assertEqual(self.drive.download_attempts[1:], [blocked])
+        self.assertEqual((self.media_dir / "blocked.mp4").read_bytes(), b"fixed")
+
+    def test_quota_errors_are_retried_on_the_next_sync(self):
+        limited = self.drive.add("limited.mp4", b"aaa")
+        self.drive.failing_downloads[limited] = (403, "downloadQuotaExceeded")
+        self.sync()
+        self.sync()
+        self.assertEqual(self.drive.download_attempts, [limited, limited])
+
+    def test_same_named_files_keep_their_paths(self):
+        self.drive = FakeDrive(page_size=1)  # Each file arrives on its own page.
+        self.drive.add("clip.mp4", b"first")
+        second = self.drive.add("clip.mp4", b"second")
+        self.sync()
+        self.assertEqual((self.media_dir / "clip.mp4").read_bytes(), b"first")
+        self.assertEqual((self.media_dir / f"clip~{second[:8]}.mp4").read_bytes(), b"second")
+
+        self.drive.downloads.clear()
+        self.sync()
+        self.assertEqual(self.drive.downloads, [])
+        self.assertEqual(self.local_files(), ["clip.mp4", f"clip~{second[:8]}.mp4"])
+
+
+if __name__ == "__main__":
+    unittest.main()
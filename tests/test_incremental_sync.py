@@ -0,0 +1,162 @@
+"""
+Incremental sync (Changes feed) against the in-memory FakeDrive.
+
+Run from the repository root with: python -m unittest discover tests
+"""
+
+import logging
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import gdrive_sync
+
+try:
+    from tests.fake_drive import FakeDrive
+except ImportError:  # The google client libraries are not installed.
+    FakeDrive = None
+
+
+@unittest.skipIf(FakeDrive is None, "needs google-api-python-client")
+class IncrementalSyncTest(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.media_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.media_dir)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        scheduler = gdrive_sync.drive_requests
+        self.addCleanup(
+            setattr, scheduler, "requests_per_second", scheduler.requests_per_second
+        )
+        self.addCleanup(setattr, scheduler, "max_retries", scheduler.max_retries)
+        scheduler.requests_per_second = 0
+        scheduler.max_retries = 0
+        self.drive = FakeDrive(page_size=2)
+        self.options = gdrive_sync.SyncOptions(incremental=True, mime_types=())
+
+    def sync(self):
+        return gdrive_sync.sync_drive_folder(self.drive, "root", self.media_dir, self.options)
+
+    def local_files(self):
+        return sorted(path.name for path in self.media_dir.iterdir() if path.is_file())
+
+    def page_token(self):
+        state = gdrive_sync.SyncState.for_media_dir(self.media_dir)
+        try:
+            return state.page_token
+        finally:
+            state.close()
+
+    def test_first_run_lists_folder_and_stores_token(self):
+        self.drive.add("a.mp4", b"aaa")
+        self.drive.add("b.mp4", b"bbb")
+        self.sync()
+        self.assertEqual(self.local_files(), ["a.mp4", "b.mp4"])
+        self.assertGreater(self.drive.list_calls, 0)
+        self.assertEqual(self.page_token(), self.drive.token())
+
+    def test_applies_only_the_deltas(self):
+        first = self.drive.add("a.mp4", b"old")
+        self.drive.add("b.mp4", b"bbb")
+        self.sync()
+        self.drive.downloads.clear()
+        list_calls = self.drive.list_calls
+
+        self.drive.update(first, content=b"new content")
+        added = self.drive.add("c.mp4", b"ccc")
+        self.sync()
+
+        self.assertEqual(self.drive.list_calls, list_calls)  # no full listing
+        self.assertEqual(set(self.drive.downloads), {first, added})
+        self.assertEqual((self.media_dir / "a.mp4").read_bytes(), b"new content")
+        self.assertEqual(self.local_files(), ["a.mp4", "b.mp4", "c.mp4"])
+        self.assertEqual(self.page_token(), self.drive.token())
+
+    def test_rename_moves_the_local_file(self):
+        file_id = self.drive.add("a.mp4", b"aaa")
+        self.sync()
+        self.drive.downloads.clear()
+        self.drive.update(file_id, name="renamed.mp4")
+        self.sync()
+        self.assertEqual(self.local_files(), ["renamed.mp4"])
+        self.assertEqual(self.drive.downloads, [])  # reused, not downloaded again
+
+    def test_same_named_file_from_the_feed_gets_its_own_path(self):
+        self.drive.add("clip.mp4", b"first")
+        second = self.drive.add("clip.mp4", b"second")
+        self.sync()
+        self.drive.downloads.clear()
+
+        third = self.drive.add("clip.mp4", b"third")
+        self.sync()
+
+        self.assertEqual(self.drive.downloads, [third])
+        self.assertEqual(
+            self.local_files(), ["clip.mp4", f"clip~{second[:8]}.mp4", f"clip~{third[:8]}.mp4"]
+        )
+        self.assertEqual((self.media_dir / "clip.mp4").read_bytes(), b"first")
+
+    def test_removed_and_trashed_files_are_deleted(self):
+        trashed = self.drive.add("a.mp4", b"aaa")
+        removed = self.drive.add("b.mp4", b"bbb")
+        self.drive.add("c.mp4", b"ccc")
+        self.sync()
+
+        self.drive.trash(trashed)
+        self.drive.remove(removed)
+        self.sync()
+
+        self.assertEqual(self.local_files(), ["c.mp4"])
+        state = gdrive_sync.SyncState.for_media_dir(self.media_dir)
+        self.addCleanup(state.close)
+        self.assertNotIn(trashed, state.all_files())
+        self.assertNotIn(removed, state.all_files())
+
+    def test_invalid_token_falls_back_to_full_listing(self):
+        self.drive.add("a.mp4", b"aaa")
+        self.sync()
+        self.drive.expire_tokens()
+        self.drive.add("b.mp4", b"bbb")
+        list_calls = self.drive.list_calls
+
+        self.sync()
+
+        self.assertGreater(self.drive.list_calls, list_calls)
+        self.assertEqual(self.local_files(), ["a.mp4", "b.mp4"])
+        self.assertEqual(self.page_token(), self.drive.token())
+
+    def test_token_does_not_advance_when_a_download_fails(self):
+        self.drive.add("a.mp4", b"aaa")
+        self.sync()
+        token = self.page_token()
+
+        failing = self.drive.add("b.mp4", b"bbb")
+        self.drive.failing_downloads[failing] = 500
+        self.sync()
+        self.assertEqual(self.page_token(), token)
+        self.assertEqual(self.local_files(), ["a.mp4"])
+
+        # The next run replays the same changes and picks the file up.
+        del self.drive.failing_downloads[failing]
+        list_calls = self.drive.list_calls
+        self.sync()
+        self.assertEqual(self.drive.list_calls, list_calls)
+        self.assertEqual(self.local_files(), ["a.mp4", "b.mp4"])
+        self.assertEqual(self.page_token(), self.drive.token())
+
+    def test_token_does_not_advance_when_the_feed_fails(self):
+        self.drive.add("a.mp4", b"aaa")
+        self.sync()
+        token = self.page_token()
+        self.drive.add("b.mp4", b"bbb")
+        self.drive.changes_error = 500
+
+        self.sync()
+
+        self.assertEqual(self.page_token(), token)
+        self.assertEqual(self.local_files(), ["a.mp4"])
+
+
+if __name__ == "__main__":
+    unittest.main()